@@ -0,0 +1,95 @@
+import argparse
+import os
+import random
+
+
+def generate(out_dir: str,
+             sections: int = 2000,
+             depth: int = 40,
+             fanout: int = 20,
+             literal_size: int = 500,
+             seed: int = 0) -> str:
+    # writes a synthetic config tree into out_dir and returns the path of the root file:
+    #   node::*    - `sections` sections with scalars, field references (node::i/value) and section references
+    #   chain::*   - an inheritance chain `depth` levels deep, every level overrides one field
+    #   remote::*  - @-references fanning out into `fanout` other files (lib_*.cfg)
+    #   literal::* - big nested array/dict literals with `literal_size` elements
+    #   lookup::*  - entry points for deep paths like lookup::root/target/link/value
+    rnd = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    lines = []
+    leafs = max(1, sections // 10)
+    for i in range(leafs):
+        lines += ['[leaf::{}]'.format(i),
+                  'name = leaf-{}'.format(i),
+                  'value = {}'.format(i),
+                  'weights = [{}]'.format(', '.join(str(rnd.random()) for _ in range(4))),
+                  '']
+
+    for i in range(sections):
+        lines += ['[node::{}]'.format(i),
+                  'value = {}'.format(i),
+                  'ratio = {}'.format(i / 10),
+                  'label = \'node-{}\''.format(i),
+                  'enabled = {}'.format('true' if i % 2 else 'false'),
+                  'tags = [a, b, {}]'.format(i),
+                  'link = leaf::{}'.format(rnd.randrange(leafs))]
+        if i > 0:
+            lines.append('prev = node::{}/value'.format(rnd.randrange(i)))
+        lines.append('')
+
+    lines += ['[chain::0]'] + ['field_{} = {}'.format(f, f) for f in range(20)] + ['']
+    for level in range(1, depth):
+        lines += ['[chain::{}({})]'.format(level, level - 1),
+                  'field_{} = {}'.format(level % 20, level),
+                  '']
+
+    for i in range(fanout):
+        lines += ['[remote::{}]'.format(i),
+                  'shared = lib::{}@lib_{}'.format(i, i),
+                  'value = lib::{}/value@lib_{}'.format(i, i),
+                  '']
+        with open(os.path.join(out_dir, 'lib_{}.cfg'.format(i)), 'w') as f:
+            f.write('\n'.join(['[lib::base]',
+                               'kind = lib',
+                               'values = [1, 2, 3]',
+                               '',
+                               '[lib::{}(base)]'.format(i),
+                               'value = {}'.format(i),
+                               'options = {{a => {}, b => [x, y, z]}}'.format(i),
+                               '']))
+
+    for i in range(max(1, sections // 200)):
+        items = ', '.join('[{0}, {0}.5, \'s{0}\', {{k => {0}}}]'.format(j) for j in range(literal_size))
+        lines += ['[literal::{}]'.format(i),
+                  'array = [{}]'.format(items),
+                  'table = {{{}}}'.format(', '.join('k{0} => [{0}, {1}]'.format(j, j + 1) for j in range(literal_size))),
+                  '']
+
+    lines += ['[lookup::root]',
+              'target = node::{}'.format(sections - 1),
+              'chain = chain::{}'.format(depth - 1),
+              'remote = remote::0',
+              '']
+
+    root = os.path.join(out_dir, 'root.cfg')
+    with open(root, 'w') as f:
+        f.write('\n'.join(lines))
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description='generate a synthetic supercfg config tree')
+    parser.add_argument('out_dir')
+    parser.add_argument('--sections', type=int, default=2000)
+    parser.add_argument('--depth', type=int, default=40)
+    parser.add_argument('--fanout', type=int, default=20)
+    parser.add_argument('--literal-size', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(generate(args.out_dir, args.sections, args.depth, args.fanout, args.literal_size, args.seed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Any
+
+from benchmarks.generate import generate
+from supercfg import Cfg, CfgRegistry, stats
+
+
+def _time(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return {'min': min(runs), 'median': statistics.median(runs), 'max': max(runs), 'repeat': repeat}
+
+
+def _parse(root: str, lazy: bool = False) -> Cfg:
+    return Cfg.parse(root, lazy=lazy, registry=CfgRegistry(max_size=0))  # every run starts cold
+
+
+def scenarios(root: str, lookups: int) -> Dict[str, Callable[[], Any]]:
+    warm = _parse(root)
+    warm.sections  # noqa
+
+    def lookup():
+        for _ in range(lookups):
+            warm['lookup::root/target/link/value']
+            warm['lookup::root/chain/field_0']
+            warm['node::1/label']
+
+    def accessor():
+        reads = [warm.accessor('lookup::root/target/link/value'),
+                 warm.accessor('lookup::root/chain/field_0'),
+                 warm.accessor('node::1/label')]
+        for _ in range(lookups):
+            for read in reads:
+                read()
+
+    def to_dict():
+        for sect in warm.sections.values():
+            sect.to_dict  # noqa
+
+    def lazy_lookup():
+        _parse(root, lazy=True)['lookup::root/target/link/value']
+
+    return {
+        'parse': lambda: _parse(root),
+        'sections': lambda: _parse(root).sections,
+        'tree': lambda: Cfg.parse_tree(os.path.dirname(root), registry=CfgRegistry(max_size=0)),
+        'lookup': lookup,
+        'accessor': accessor,
+        'to_dict': to_dict,
+        'lazy_lookup': lazy_lookup,
+    }
+
+
+def run(root: str, repeat: int, lookups: int, only=None) -> Dict[str, Any]:
+    results = {}
+    for name, func in scenarios(root, lookups).items():
+        if only and name not in only:
+            continue
+        results[name] = _time(func, repeat)
+    return results
+
+
+def instrumented(root: str) -> Dict[str, Any]:
+    # phase times and counters of one cold `sections` run
+    stats.enable()
+    try:
+        _parse(root).sections  # noqa
+        snapshot = Cfg.stats()
+    finally:
+        stats.disable()
+    # every parsed section is resolved at most once: 'resolved' <= 'parsed', 'max_per_section' == 1
+    resolves = snapshot.pop('resolves')
+    counters = snapshot['counters']
+    snapshot['resolves'] = {'resolved': counters.get('resolve_calls', 0),
+                            'parsed': counters.get('sections_parsed', 0),
+                            'max_per_section': max((n for file in resolves.values() for n in file.values()), default=0)}
+    return snapshot
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]):
+    for name, result in results['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            print('{:<12} {:>10.4f}s  (new)'.format(name, result['median']))
+            continue
+        print('{:<12} {:>10.4f}s  {:>10.4f}s  x{:.2f}'.format(name, before['median'], result['median'],
+                                                           before['median'] / max(result['median'], 1e-9)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='supercfg benchmarks')
+    parser.add_argument('--sections', type=int, default=2000)
+    parser.add_argument('--depth', type=int, default=40)
+    parser.add_argument('--fanout', type=int, default=20)
+    parser.add_argument('--literal-size', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--lookups', type=int, default=10000)
+    parser.add_argument('--only', nargs='*', help='scenario names')
+    parser.add_argument('--stats', action='store_true', help='include phase times and counters')
+    parser.add_argument('--output', help='write results as json')
+    parser.add_argument('--compare', help='json results of a previous run')
+    args = parser.parse_args()
+
+    params = {'sections': args.sections, 'depth': args.depth, 'fanout': args.fanout,
+              'literal_size': args.literal_size, 'repeat': args.repeat, 'lookups': args.lookups}
+    with tempfile.TemporaryDirectory() as out_dir:
+        root = generate(out_dir, args.sections, args.depth, args.fanout, args.literal_size)
+        results = {
+            'params': params,
+            'python': sys.version,
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'scenarios': run(root, args.repeat, args.lookups, args.only),
+        }
+        if args.stats:
+            results['stats'] = instrumented(root)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    else:
+        for name, result in results['scenarios'].items():
+            print('{:<12} {:>10.4f}s'.format(name, result['median']))
+    if args.stats:
+        print(json.dumps(results['stats'], indent=2))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -15,8 +15,11 @@ setup(
     long_description=readme,
     long_description_content_type="text/markdown",
     url="https://github.com/IgorTavcar/supercfg",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*", "tests", "tests.*"]),
     install_requires=requirements,
+    entry_points={
+        "console_scripts": ["supercfg = supercfg.cli:main"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3.9",
         "License :: OSI Approved :: GNU General Public License v3 (GPLv3)",
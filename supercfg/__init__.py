@@ -1,2 +1,17 @@
 from supercfg.cfg import Cfg
+from supercfg.cfg import CfgOverlay
 from supercfg.cfg import Section
+from supercfg.frozen import FrozenCfg
+from supercfg.frozen import FrozenSection
+from supercfg.registry import CfgRegistry
+from supercfg.schema import Schema
+from supercfg.schema import TypedSection
+from supercfg.search import Manifest
+from supercfg.search import SearchPath
+from supercfg.shm import SharedCfg
+from supercfg.shm import SharedSection
+from supercfg.sweep import Sweep
+from supercfg.templates import Templates
+from supercfg import stats
+from supercfg import symbols
+from supercfg.watch import CfgWatcher
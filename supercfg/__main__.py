@@ -0,0 +1,5 @@
+import sys
+
+from supercfg.cli import main
+
+sys.exit(main())
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+from typing import Optional, Dict, Any, List, Tuple
+
+_VERSION = 4
+_TEMPLATE_PATTERN = re.compile(rb'\$\(([a-zA-Z0-9_]+)\)')
+
+
+class CfgCache:
+    # persistent cache of fully resolved sections, one pickle per root file;
+    # an entry is valid while the root file and every @-referenced file are unchanged (mtime/size, then content hash)
+
+    def __init__(self, cache_dir: str):
+        self._dir = cache_dir
+
+    @property
+    def dir(self) -> str:
+        return self._dir
+
+    def load(self, path: str) -> Optional[Dict[str, Any]]:
+        file = self._entry_file(path)
+        if not os.path.exists(file):
+            return None
+        try:
+            with open(file, 'rb') as f:
+                entry = pickle.load(f)
+        except Exception:
+            return None  # corrupt or stale (e.g. renamed classes) entry is just a miss
+
+        if not isinstance(entry, dict) or entry.get('version') != _VERSION:
+            return None
+        if entry.get('path') != os.path.abspath(path):
+            return None
+        for dependency in entry['dependencies']:
+            if not CfgCache._is_valid(dependency):
+                return None
+        return entry
+
+    def store(self, cfg) -> bool:
+        try:
+            sections = cfg.sections  # resolves the whole file and loads all @-referenced files
+        except Exception:
+            return False  # a broken section fails when it's used, as without the cache
+        files = [cfg.path] + cfg.dependencies
+        dependencies = []
+        for file in files:
+            dependency = CfgCache._fingerprint(file)
+            if dependency is None:
+                return False
+            dependencies.append(dependency)
+
+        entry = {
+            'version': _VERSION,
+            'path': os.path.abspath(cfg.path),
+            'dependencies': dependencies,
+            'headers': cfg.headers,
+            'sections': sections,
+        }
+        try:
+            data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False  # not everything a config can hold is picklable (e.g. enums of local classes)
+
+        os.makedirs(self._dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self._dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self._entry_file(cfg.path))  # atomic, concurrent workers never see a partial entry
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return True
+
+    def invalidate(self, path: str):
+        file = self._entry_file(path)
+        if os.path.exists(file):
+            os.remove(file)
+
+    # private
+
+    def _entry_file(self, path: str) -> str:
+        key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+        return os.path.join(self._dir, '{}.pickle'.format(key))
+
+    @staticmethod
+    def _fingerprint(file: str) -> Optional[Tuple[str, int, int, str]]:
+        with open(file, 'rb') as f:
+            content = f.read()
+        # $(TIMESTAMP), $(UUID), ... are evaluated per loaded cfg, a cached value would be stale
+        if _TEMPLATE_PATTERN.search(content):
+            return None
+        st = os.stat(file)
+        return os.path.abspath(file), st.st_mtime_ns, st.st_size, hashlib.sha256(content).hexdigest()
+
+    @staticmethod
+    def _is_valid(dependency: List) -> bool:
+        file, mtime_ns, size, digest = dependency
+        try:
+            st = os.stat(file)
+        except OSError:
+            return False
+        if st.st_mtime_ns == mtime_ns and st.st_size == size:
+            return True
+        if st.st_size != size:
+            return False
+        with open(file, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest() == digest  # touched, but not changed
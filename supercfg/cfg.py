@@ -1,36 +1,86 @@
+import asyncio
+import bisect
 import configparser
+import fnmatch
 import os
 import re
-import time
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dataclasses import dataclass
-from enum import Enum
 from pathlib import Path
-from typing import Tuple, Optional, Callable, AnyStr, Match, Dict, Any
+from types import MappingProxyType
+from typing import Tuple, Optional, Callable, Dict, Any, List
+
+from supercfg import symbols
+from supercfg.cache import CfgCache
+from supercfg.frozen import FrozenCfg, FrozenSection
+from supercfg.lexer import Lexer
+from supercfg.reader import IndexedParser
+from supercfg.registry import CfgRegistry
+from supercfg.schema import Schema, TypedSection
+from supercfg.search import SearchPath
+from supercfg.shm import SharedCfg
+from supercfg.stats import phase, count, count_resolve, snapshot
+from supercfg.sweep import Sweep
+from supercfg.templates import Templates
 
 _SUPERCLASS_PATTERN = re.compile(r'^[^(]+\(([^)]+)\)')
-_NONE_PATTERN = re.compile(r'None|none|NONE')
-_INT_PATTERN = re.compile(r'^([+-]?[0-9_]+)$')
-_INT_EXP_PATTERN = re.compile(r'^([+-]?[0-9_]+e[+]?[0-9_]+)$')
-_FLOAT_PATTERN = re.compile(r'^([+-]?[0-9_]*\.[0-9_]*(e[+-]?[0-9_]+)?)$')
-_FLOAT_PATTERN_2 = re.compile(r'^([+-]?[0-9_]+e-[0-9_]+)$')
-_BOOL_PATTERN = re.compile(r'^(true|false)$')
-_QUOTED_PATTERN = re.compile(r"'(.*)'|\"(.*)\"")
-_RE_PATTERN = re.compile(r"pattern:(.+)")
 _SECT_PATTERN = re.compile(r"(.+)::(.+)")
-_TEMPLATE_PATTERN = re.compile(r'\$\(([a-zA-Z0-9_]+)\)')
-_ENUM_PATTERN = re.compile(r"enum:(.+)")
+# cross-file references in raw values (clazz::name@file), scanned before tokenizing to prefetch the files
+_MONKEY_PATTERN = re.compile(r'::[^@\s,\[\]{}]*@([^\s,\[\]{}\'"]+)')
+
+# resolver nodes: (_SECTION, section) and (_FIELD, section, field)
+_SECTION = 'section'
+_FIELD = 'field'
+
+# section states: parsed -> resolving (while on the resolver's stack) -> resolved, a failed run resets to parsed
+_PARSED = 0
+_RESOLVING = 1
+_RESOLVED = 2
+
+# bumped whenever resolved values change (Section.__setitem__, attribute assignment, Cfg.reload), invalidates path
+# indexes and accessors of all cfgs - a section may be reachable from several of them
+_generation = 0
+_MISSING = object()
+
+# resolution and lazy parsing modify shared sections, they are serialized (reads of resolved sections are not)
+_lock = threading.RLock()
+
+
+# asyncio loads in progress: (loop, absolute path, lazy, cache dir, registry id) -> future, see Cfg.aparse()
+_in_flight = {}
+
+
+def _changed():
+    global _generation
+    _generation += 1
 
 
 #
 
 
 class Cfg:
-    def __init__(self, path, parser):
+    def __init__(self, path, parser, lazy: bool = False, registry: Optional[CfgRegistry] = None):
         self._path = path
         self._parser = parser
+        self._lazy = lazy
+        self._registry = registry
         self._sections = None
+        self._resolved = False
+        self._loaded = None
+        self._headers = None
+        self._classes = None
+        self._dependents_cache = None
+        self._lexer = None
         self._cached_cfgs = None
+        self._cached_dependencies = None
+        self._stamps = None  # absolute path -> (mtime_ns, size) of the files read into this cfg, when read
+        self._shared = False
+        self._index = None
+        self._index_generation = None
+        self._frozen = None
+        self._templates = None
 
     @property
     def path(self) -> str:
@@ -45,100 +95,795 @@ class Cfg:
         return self._parser
 
     @property
-    def sections(self, template_resolver: Optional[Callable[[Match[AnyStr]], AnyStr]] = None):
-        if self._sections is not None:
-            return self._sections
+    def lazy(self) -> bool:
+        return self._lazy
+
+    @property
+    def indexed(self) -> bool:
+        return isinstance(self._parser, IndexedParser)
 
-        self._sections = self._parse_sections()
-        self._resolve_sect_refs()
-        self._resolve_templates(template_resolver)
+    @property
+    def templated(self) -> bool:
+        # some raw value of this file uses $(...) variables
+        if self._parser is None:
+            return False  # loaded from the disk cache, which doesn't take templated files
+        if isinstance(self._parser, IndexedParser):
+            return self._parser.contains('$(')
+        return any('$(' in value for key in self._parser.sections() for _, value in self._parser.items(key, raw=True))
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # section identifier -> section key (as written in the file, e.g. 'a::2(1)')
+        if self._headers is None:
+            build = {}
+            for key in self._parser.sections():
+                clazz, name, _ = Section.split_key(key)
+                build['{}::{}'.format(clazz, name)] = key
+            self._headers = build
+        return self._headers
+
+    @property
+    def lexer(self) -> Lexer:
+        if self._lexer is None:
+            self._lexer = Lexer(self._parser,
+                                section=lambda key: Section._inline(self, key),
+                                reference=lambda value: Section._reference(self, value),
+                                enum=lambda value: symbols.value('enum', value),
+                                symbol=symbols.value)
+        return self._lexer
+
+    @property
+    def templates(self) -> Templates:
+        # $(NAME) variables, evaluated once per cfg
+        if self._templates is None:
+            self._templates = Templates()
+        return self._templates
 
+    @property
+    def sections(self):
+        if self._sections is None or not self._resolved:
+            with _lock:
+                if self._sections is None:
+                    self._sections = self._parse_sections()
+                if not self._resolved:
+                    # sections of this cfg may already be (partially) resolved through references from other cfgs
+                    Section.resolve_all(list(self._sections.values()))
+                    self._resolved = True
         return self._sections
 
+    @property
+    def dependencies(self) -> List[str]:
+        # files pulled in (transitively) through @ references so far
+        build = list(self._cached_dependencies or [])
+        visited = {self._path, *build}
+        pending = [self]
+        while pending:
+            cfg = pending.pop()
+            for file, other in (cfg._cached_cfgs or {}).items():
+                if file not in visited:
+                    visited.add(file)
+                    build.append(file)
+                    pending.append(other)
+                    # a cfg loaded from the disk cache knows its dependencies without loading them
+                    for dependency in other._cached_dependencies or ():
+                        if dependency not in visited:
+                            visited.add(dependency)
+                            build.append(dependency)
+        return build
+
+    @property
+    def stamps(self) -> Dict[str, Tuple[int, int]]:
+        # (mtime_ns, size) when read of this file and of the files pulled in through @ references so far
+        build = {}
+        for cfg in self._graph().values():
+            build.update(cfg._stamps or {})
+        return build
+
+    def reload(self, files: Optional[List[str]] = None) -> List[str]:
+        # re-reads `files` (default: this file and all its dependencies), re-parses & re-resolves only sections that
+        # changed or (transitively) depend on a changed section; returns identifiers of changed sections of this cfg
+        SearchPath.invalidate()  # @ references may name files which appeared or disappeared meanwhile
+        with _lock:
+            return self._reload(files)
+
     def options(self, section: str):
         return self.sections[section]
 
+    def freeze(self) -> FrozenCfg:
+        # deeply immutable snapshot of all the (resolved) sections, for lock-free reads from any thread or forked
+        # process; the same snapshot is returned until something changes
+        frozen = self._frozen
+        if frozen is not None and frozen[0] == _generation:
+            return frozen[1]
+        with _lock:
+            generation = _generation
+            memo = {}
+            build = {identifier: Section._freeze(sect, memo) for identifier, sect in self.sections.items()}
+            frozen = FrozenCfg(self._path, MappingProxyType(build))
+            self._frozen = (generation, frozen)
+        return frozen
+
+    def share(self, name: Optional[str] = None) -> SharedCfg:
+        # serializes the frozen snapshot into a new shared memory block; worker processes attach to it by name
+        # (SharedCfg.attach(name) or pickling the returned view) and decode only the values they read; the caller
+        # owns the block: close() and unlink() it when the workers are done
+        return SharedCfg.create(self.freeze(), name)
+
+    def typed(self, schema) -> Dict[str, TypedSection]:
+        # sections of a clazz as instances of a generated slotted class, validated once: attribute reads are plain
+        # slot reads; schema: a Schema, or a clazz to infer one from its sections
+        if isinstance(schema, str):
+            schema = Schema.infer(self, schema)
+        return schema.load_all(self)
+
+    def match(self, pattern: str) -> List[str]:
+        # identifiers of the sections matching a 'clazz::name' glob (e.g. 'tokenizer::roberta-*', '*::base'), in
+        # file order; uses the section headers only, nothing is parsed
+        clazz, name = Section._split_at_2colons(pattern)
+        if name is None:
+            raise Exception('wrong section pattern: {}'.format(pattern))
+        positions, classes = self._class_index()
+        if Cfg._is_glob(clazz):
+            candidates = [entries for key, entries in classes.items() if fnmatch.fnmatchcase(key, clazz)]
+        else:
+            candidates = [classes[clazz]] if clazz in classes else []
+
+        prefix = Cfg._glob_prefix(name)
+        build = []
+        for entries in candidates:
+            # entries: (name, identifier) sorted by name, the literal prefix of the pattern narrows the scan
+            for i in range(bisect.bisect_left(entries, (prefix,)), len(entries)):
+                sect_name, identifier = entries[i]
+                if not sect_name.startswith(prefix):
+                    break
+                if fnmatch.fnmatchcase(sect_name, name):
+                    build.append(identifier)
+        build.sort(key=positions.get)
+        return build
+
+    def select(self, pattern: str):
+        # lazily yields the resolved sections matching a 'clazz::name' glob, only those (and what they depend on)
+        # are parsed & resolved; 'clazz::name@file' selects from another cfg
+        split_at_monkey = Section._split_at_monkey(pattern)
+        if split_at_monkey:
+            other = self.parse_other_cfg(split_at_monkey[1])
+            if other is None:
+                raise Exception('no such cfg: {}.cfg, from: {}, at: {}'.format(split_at_monkey[1], pattern, self.dir))
+            yield from other.select(split_at_monkey[0])
+            return
+        for identifier in self.match(pattern):
+            if self._sections is not None and self._resolved:
+                yield self._sections[identifier]
+                continue
+            with _lock:
+                sect = self._lookup(identifier)
+                sect.resolve()
+            yield sect
+
+    def overlay(self, overrides: Dict[str, Any], raw: bool = False) -> 'CfgOverlay':
+        # copy-on-write view with overridden fields, e.g. cfg.overlay({'tokenizer::roberta/vocab_size': 16384}):
+        # costs O(overrides), untouched sections are shared with this cfg; raw: values are written in the cfg syntax
+        # ('[1, 2]', 'fs::local', ...) and parsed like values in the file
+        return CfgOverlay(self, CfgOverlay.split_overrides(self, overrides, raw))
+
+    def sweep(self, identifier: str) -> 'Sweep':
+        # variants of the base section of a [sweep::...] section, expanded lazily (see Sweep)
+        return Sweep(self, identifier)
+
+    def build_index(self) -> int:
+        # flattens all sections of this cfg into the path index: 'clazz::name', 'clazz::name/field',
+        # 'clazz::name/field/field' (nested sections) ...; returns the number of indexed paths
+        index = self._current_index()
+        for identifier, sect in self.sections.items():
+            pending = [(identifier, sect, (id(sect),))]
+            while pending:
+                prefix, sect, seen = pending.pop()
+                index[prefix] = sect
+                for field, value in sect.all_fields.items():
+                    if value is None:
+                        continue  # a lookup raises 'no such option'
+                    path = '{}/{}'.format(prefix, field)
+                    if isinstance(value, Section):
+                        if id(value) not in seen:
+                            pending.append((path, value, seen + (id(value),)))
+                    else:
+                        index[path] = value
+        return len(index)
+
+    def accessor(self, path: str) -> Callable[[], Any]:
+        # compiled read of a single path, e.g. `vocab_size = cfg.accessor('dataset::x/tokenizer/vocab_size')`;
+        # calling it costs a generation check, the path is looked up again only after a change
+        cached = [None, None]
+
+        def read():
+            if cached[1] != _generation:
+                generation = _generation
+                cached[0] = self[path]
+                cached[1] = generation
+            return cached[0]
+
+        return read
+
     def parse_other_cfg(self, name, cache: bool = True):
-        file = "{0}.cfg".format(os.path.join(self.dir, name))
-        if file == self._path:
+        # the cfg of a `@name` reference, found in the dir of this cfg or on the search path (see SearchPath)
+        file = self._other_file(name)
+        if file is None or file == self._path:
             return None
 
         if cache and self._cached_cfgs and file in self._cached_cfgs:
+            count('cross_file_cache_hits')
             return self._cached_cfgs[file]
 
-        if os.path.exists(file):
-            parsed = Cfg.parse(file)
-            if cache:
-                if self._cached_cfgs is None:
-                    self._cached_cfgs = {}
-                self._cached_cfgs[file] = parsed
-            return parsed
-        return None
+        count('cross_file_loads')
+        parsed = Cfg.parse(file, lazy=self._lazy, registry=self._registry, indexed=self.indexed)
+        if cache:
+            if self._cached_cfgs is None:
+                self._cached_cfgs = {}
+            self._cached_cfgs[file] = parsed
+        return parsed
 
     @staticmethod
-    def parse(path: str):
+    def parse(path: str, lazy: bool = False, cache_dir: Optional[str] = None, registry: Optional[CfgRegistry] = None,
+              indexed: bool = False):
+        # indexed: the file is memory-mapped and only its section headers are indexed upfront, options of a section
+        # are read when the section is parsed (with lazy=True a lookup parses just the sections it needs)
         if not os.path.exists(path):
             raise Exception('no such file: {}'.format(path))
-        cfg = configparser.ConfigParser()
-        cfg.read(path)
-        return Cfg(path, cfg)
+        if registry is None:
+            registry = CfgRegistry.default()
+        # files with $(...) templates are loaded afresh, every parse evaluates its own $(UUID), $(TIMESTAMP), ...
+        return registry.get(path, lazy, lambda: Cfg._load(path, lazy, cache_dir, registry, indexed),
+                            share=Cfg._share, indexed=indexed)
+
+    @staticmethod
+    def parse_tree(root: str, workers: Optional[int] = None, lazy: bool = False, cache_dir: Optional[str] = None,
+                   registry: Optional[CfgRegistry] = None) -> Dict[str, 'Cfg']:
+        # loads all *.cfg files under the root dir (and the files they @-reference) concurrently: files are read as
+        # soon as a reference to them is seen in a raw value, sections are tokenized in the pool too, only the
+        # resolution (shared sections) runs serialized; returns file path -> cfg, cfgs are linked into one graph
+        if not os.path.isdir(root):
+            raise Exception('no such dir: {}'.format(root))
+        if registry is None:
+            registry = CfgRegistry.default()
+        files = []
+        for dir_path, dir_names, file_names in os.walk(root):
+            dir_names.sort()
+            files.extend(os.path.join(dir_path, name) for name in sorted(file_names) if name.endswith('.cfg'))
+
+        loaded = {}
+        references = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # read (and prefetch references of) all the files
+            pending = {}
+            for file in files:
+                loaded[os.path.abspath(file)] = None
+                pending[pool.submit(Cfg._read_references, file, lazy, cache_dir, registry)] = file
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    cfg, cfg_references = future.result()
+                    loaded[os.path.abspath(cfg.path)] = cfg
+                    references[os.path.abspath(cfg.path)] = cfg_references
+                    for file in cfg_references:
+                        if os.path.abspath(file) not in loaded:
+                            count('cross_file_prefetches')
+                            loaded[os.path.abspath(file)] = None
+                            pending[pool.submit(Cfg._read_references, file, lazy, cache_dir, registry)] = file
+            Cfg._link(loaded, references)
+
+            # tokenize
+            if not lazy:
+                pending = [cfg for cfg in loaded.values() if cfg._sections is None]
+                for cfg, sections in zip(pending, pool.map(Cfg._parse_sections, pending)):
+                    with _lock:
+                        if cfg._sections is None:
+                            cfg._sections = sections
+
+        if not lazy:
+            for cfg in loaded.values():
+                cfg.sections  # noqa
+        return {file: loaded[os.path.abspath(file)] for file in files}
 
     @staticmethod
-    def parse_string(script):
+    async def aparse(path: str, lazy: bool = False, cache_dir: Optional[str] = None,
+                     registry: Optional[CfgRegistry] = None) -> 'Cfg':
+        # Cfg.parse for asyncio code: the file and, concurrently, the files it @-references are read in the loop's
+        # default executor and linked, so that resolving sections later doesn't block on i/o; concurrent loads of
+        # a file share a single read
+        loop = asyncio.get_running_loop()
+        if registry is None:
+            registry = CfgRegistry.default()
+        loaded = {}
+        references = {}
+
+        async def load(file):
+            loaded[os.path.abspath(file)] = None
+            cfg, cfg_references = await Cfg._aread_references(loop, file, lazy, cache_dir, registry)
+            loaded[os.path.abspath(file)] = cfg
+            references[os.path.abspath(file)] = cfg_references
+            await asyncio.gather(*[load(other) for other in cfg_references if os.path.abspath(other) not in loaded])
+
+        await load(path)
+        Cfg._link(loaded, references)
+        return loaded[os.path.abspath(path)]
+
+    async def aparse_other_cfg(self, name, cache: bool = True):
+        # parse_other_cfg for asyncio code
+        file = await asyncio.get_running_loop().run_in_executor(None, self._other_file, name)
+        if file is None or file == self._path:
+            return None
+
+        if cache and self._cached_cfgs and file in self._cached_cfgs:
+            count('cross_file_cache_hits')
+            return self._cached_cfgs[file]
+
+        count('cross_file_loads')
+        parsed = await Cfg.aparse(file, lazy=self._lazy, registry=self._registry)
+        if cache:
+            if self._cached_cfgs is None:
+                self._cached_cfgs = {}
+            self._cached_cfgs[file] = parsed
+        return parsed
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        # process-wide numbers collected since supercfg.stats.enable(), {} when disabled
+        return snapshot()
+
+    @staticmethod
+    def parse_string(script, lazy: bool = False):
         cfg = configparser.ConfigParser()
         cfg.read_string(script)
-        return Cfg("tmp/{}.cfg".format(str(uuid.uuid4())), cfg)
+        return Cfg("tmp/{}.cfg".format(str(uuid.uuid4())), cfg, lazy=lazy)
 
     #
 
     def __getitem__(self, item):
+        index = self._index
+        if index is not None and self._index_generation == _generation:
+            value = index.get(item, _MISSING)
+            if value is not _MISSING:
+                return value
+
+        generation = _generation
         path = item.split('/')
         if len(path) == 1:
-            qualifier = path[0]
-            resolved = Section.resolve_reference(self, qualifier)
-            if resolved:
-                return resolved
-            return self.sections[path[0]]
-        return self._value_at(None, path)
+            value = Section.resolve_reference(self, item) if '@' in item else None
+            if not value:
+                value = self._section(item)
+        else:
+            value = self._value_at(path)
+        if generation == _generation:
+            self._current_index()[item] = value
+        return value
 
     def __str__(self):
         return self._sections if self._sections is not None else "Cfg[...]"
 
     #
 
+    def _reload(self, files: Optional[List[str]]) -> List[str]:
+        graph = self._graph()
+        root = os.path.abspath(self._path)
+        files = list(graph) if files is None else [os.path.abspath(file) for file in files]
+        for path, cfg in graph.items():
+            # a cfg loaded from the disk cache didn't load its @ dependencies: it's re-read from source (all its
+            # sections change) when one of them changes
+            if cfg.parser is None and path not in files and \
+                    any(os.path.abspath(file) in files for file in cfg._cached_dependencies or ()):
+                files.append(path)
+
+        parsers = {}
+        stamps = {}
+        changed = set()
+        for file in files:
+            if file not in graph:
+                continue
+            stamps[file] = Cfg._stat(file)
+            if stamps[file] is None:
+                # configparser would read a missing file as an empty one and drop all its sections
+                raise Exception('no such file: {}'.format(file))
+            parser = Cfg._read(file, graph[file].indexed)
+            parsers[file] = parser
+            changed.update((file, identifier) for identifier in Cfg._diff(graph[file].parser, parser))
+            if graph[file].parser is not None:
+                graph[file]._stamps = {file: stamps[file]}  # also when only touched
+        if not changed:
+            return []
+        _changed()
+
+        dependents = {}
+        for path, cfg in graph.items():
+            for identifier, sect in cfg._loaded_sections().items():
+                for dependency in sect._dependencies or ():
+                    dependents.setdefault(dependency, []).append((path, identifier))
+        affected = set(changed)
+        pending = list(changed)
+        while pending:
+            for dependent in dependents.get(pending.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+
+        # other files holding affected sections are replaced by fresh instances
+        registry = self._registry if self._registry is not None else CfgRegistry.default()
+        paths = {path for path, _ in affected if path != root}
+        for path in paths:
+            if path not in parsers:
+                stamps[path] = Cfg._stat(path)
+                if stamps[path] is None:
+                    raise Exception('no such file: {}'.format(path))
+                parsers[path] = Cfg._read(path, graph[path].indexed)
+        fresh = {}
+        for path in paths:
+            fresh[path] = Cfg(graph[path].path, parsers[path], lazy=graph[path].lazy, registry=self._registry)
+            fresh[path]._stamps = {path: stamps[path]}
+            # unaffected sections stay the same instances (sections of this cfg may reference them)
+            fresh[path]._loaded = {identifier: sect for identifier, sect in graph[path]._loaded_sections().items()
+                                   if (path, identifier) not in affected}
+            registry.put(path, fresh[path].lazy, fresh[path], indexed=fresh[path].indexed, share=Cfg._share)
+        for path, cfg in graph.items():
+            if path not in fresh:
+                for file, other in (cfg._cached_cfgs or {}).items():
+                    cfg._cached_cfgs[file] = fresh.get(os.path.abspath(file), other)
+
+        if root in parsers:
+            self._parser = parsers[root]
+            self._headers = None
+            self._cached_dependencies = None
+            self._stamps = {root: stamps[root]}
+        self._lexer = None  # interned references may point to replaced cfgs
+        identifiers = sorted(identifier for path, identifier in affected if path == root)
+        if self._sections is None:
+            for identifier in identifiers:
+                (self._loaded or {}).pop(identifier, None)
+            return identifiers
+
+        build = {}
+        created = []
+        for identifier, key in self.headers.items():
+            sect = self._sections.get(identifier)
+            if sect is None or identifier in identifiers:
+                sect = Section.parse(self, key)
+                created.append(sect)
+            build[identifier] = sect
+        self._sections = build
+        Section.resolve_all(created)
+        return identifiers
+
+    @staticmethod
+    def _load(path: str, lazy: bool, cache_dir: Optional[str], registry: CfgRegistry, indexed: bool = False):
+        cache = CfgCache(cache_dir) if cache_dir is not None else None
+        if cache is not None:
+            with phase('cache'):
+                entry = cache.load(path)
+            count('disk_cache_hits' if entry is not None else 'disk_cache_misses')
+            if entry is not None:
+                cfg = Cfg(path, None, lazy=lazy, registry=registry)
+                cfg._headers = entry['headers']
+                cfg._sections = entry['sections']
+                cfg._resolved = True
+                cfg._cached_dependencies = [dependency[0] for dependency in entry['dependencies'][1:]]
+                cfg._stamps = {dependency[0]: (dependency[1], dependency[2]) for dependency in entry['dependencies']}
+                return cfg
+
+        stamp = Cfg._stat(path)  # before reading, a change while reading shows up as a stale stamp
+        cfg = Cfg(path, Cfg._read(path, indexed), lazy=lazy, registry=registry)
+        cfg._stamps = {os.path.abspath(path): stamp}
+        if cache is not None:
+            with phase('cache'):
+                if not cache.store(cfg) and not cfg._resolved and cfg._sections is not None:
+                    # not resolvable as a whole: back to parsed sections, lookups of the healthy ones still work
+                    cfg._loaded, cfg._sections = cfg._sections, None
+        return cfg
+
+    def _share(self) -> bool:
+        # called by a registry before it keeps this cfg to hand it out to other callers: its sections become
+        # read-only (changes would leak to all of them); files with templates are not shared
+        if self.templated:
+            return False
+        with _lock:
+            self._shared = True
+            for sect in self._loaded_sections().values():
+                sect._shared = True
+        return True
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    @staticmethod
+    def _read(path: str, indexed: bool = False):
+        with phase('read'):
+            if indexed:
+                return IndexedParser(path)
+            parser = configparser.ConfigParser()
+            parser.read(path)
+        return parser
+
+    @staticmethod
+    def _read_references(path: str, lazy: bool, cache_dir: Optional[str], registry: CfgRegistry):
+        # (cfg, existing files it @-references), blocking
+        cfg = Cfg.parse(path, lazy=lazy, cache_dir=cache_dir, registry=registry)
+        if cfg.parser is None:
+            return cfg, []  # loaded from the disk cache, already resolved
+        return cfg, Cfg._scan_references(cfg)
+
+    @staticmethod
+    async def _aread_references(loop, path: str, lazy: bool, cache_dir: Optional[str], registry: CfgRegistry):
+        key = (loop, os.path.abspath(path), lazy, cache_dir, id(registry))
+        future = _in_flight.get(key)
+        if future is None:
+            future = loop.run_in_executor(None, Cfg._read_references, path, lazy, cache_dir, registry)
+            _in_flight[key] = future
+            future.add_done_callback(lambda _: _in_flight.pop(key, None))
+        else:
+            count('coalesced_loads')
+        # a cancelled caller must not cancel the read for the others
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _link(loaded: Dict[str, 'Cfg'], references: Dict[str, List[str]]):
+        # points @ references to the loaded cfgs (also when the registry doesn't keep them)
+        for path, files in references.items():
+            cfg = loaded[path]
+            for file in files:
+                other = loaded.get(os.path.abspath(file))
+                if other is not None and file != cfg.path:
+                    if cfg._cached_cfgs is None:
+                        cfg._cached_cfgs = {}
+                    cfg._cached_cfgs.setdefault(file, other)
+
+    def _scan_references(self) -> List[str]:
+        # existing files named by @ references in raw values (may include false positives, e.g. in quoted strings)
+        build = []
+        for key in self._parser.sections():
+            values = [Section.split_key(key)[2] or ''] + [value for _, value in self._parser.items(key, raw=True)]
+            for value in values:
+                for name in _MONKEY_PATTERN.findall(value):
+                    file = self._other_file(name.strip())
+                    if file is not None and file not in build:
+                        build.append(file)
+        return build
+
+    def _other_file(self, name: str) -> Optional[str]:
+        return SearchPath.default().find(name, self.dir)
+
+    def _graph(self) -> Dict[str, 'Cfg']:
+        # absolute path -> cfg, for this cfg and all cfgs loaded through @ references
+        build = {os.path.abspath(self._path): self}
+        pending = [self]
+        while pending:
+            for other in (pending.pop()._cached_cfgs or {}).values():
+                path = os.path.abspath(other.path)
+                if path not in build:
+                    build[path] = other
+                    pending.append(other)
+        return build
+
+    def _loaded_sections(self) -> Dict[str, 'Section']:
+        if self._sections is not None:
+            return self._sections
+        return self._loaded or {}
+
+    @staticmethod
+    def _diff(old: Optional[configparser.ConfigParser], new: configparser.ConfigParser) -> set:
+        # identifiers of sections which were added, removed or changed (header or raw options)
+        def raw(parser):
+            build = {}
+            for key in parser.sections():
+                clazz, name, _ = Section.split_key(key)
+                build['{}::{}'.format(clazz, name)] = (key, parser.items(key, raw=True))
+            return build
+
+        after = raw(new)
+        if old is None:
+            return set(after)  # loaded from the disk cache, nothing to compare with
+        before = raw(old)
+        return {identifier for identifier in before.keys() | after.keys()
+                if before.get(identifier) != after.get(identifier)}
+
+    def _section(self, identifier: str) -> 'Section':
+        if not self._lazy or self._sections is not None:
+            return self.sections[identifier]
+
+        # lazy mode: parse & resolve only the requested section, its inheritance chain and references
+        with _lock:
+            sect = self._lookup(identifier)
+            sect.resolve()
+        return sect
+
+    def _lookup(self, identifier: str) -> 'Section':
+        # the parsed section, not necessarily resolved (used by the resolver); sections are parsed one by one until
+        # all of them are needed
+        if self._sections is not None:
+            return self._sections[identifier]
+        return self._load_section(identifier)
+
+    def _load_section(self, identifier: str) -> 'Section':
+        # parses a single section (kept until all sections are parsed)
+        if self._loaded is None:
+            self._loaded = {}
+        sect = self._loaded.get(identifier)
+        if sect is None:
+            sect = Section.parse(self, self.headers[identifier])
+            self._loaded[identifier] = sect
+        return sect
+
+    def _dependents(self) -> Dict[str, List[str]]:
+        # section identifier -> identifiers of the sections of this file which depend on it (parses all sections)
+        headers = self.headers
+        if self._dependents_cache is None or self._dependents_cache[0] is not headers:
+            path = os.path.abspath(self._path)
+            build = {}
+            for identifier in headers:
+                for dependency in self._lookup(identifier)._dependencies or ():
+                    if dependency[0] == path:
+                        build.setdefault(dependency[1], []).append(identifier)
+            self._dependents_cache = (headers, build)
+        return self._dependents_cache[1]
+
+    def _class_index(self) -> Tuple[Dict[str, int], Dict[str, List[Tuple[str, str]]]]:
+        # (identifier -> position in the file, clazz -> sorted (name, identifier)), rebuilt when the headers change
+        headers = self.headers
+        if self._classes is None or self._classes[0] is not headers:
+            positions = {}
+            classes = {}
+            for identifier in headers:
+                positions[identifier] = len(positions)
+                clazz, name = identifier.split('::', 1)
+                classes.setdefault(clazz, []).append((name, identifier))
+            for entries in classes.values():
+                entries.sort()
+            self._classes = (headers, positions, classes)
+        return self._classes[1], self._classes[2]
+
     def _parse_sections(self):
         build = {}
         for name in self._parser.sections():
-            sect = Section.parse(self, name)
-            build['{}::{}'.format(sect.clazz, sect.name)] = sect
+            clazz, sect_name, _ = Section.split_key(name)
+            identifier = '{}::{}'.format(clazz, sect_name)
+            if self._loaded is not None and identifier in self._loaded:
+                build[identifier] = self._loaded[identifier]
+                continue
+            build[identifier] = Section.parse(self, name)
         return build
 
-    def _resolve_sect_refs(self):
-        for _, sect in self._sections.items():
-            sect.resolve()
+    @staticmethod
+    def _is_glob(pattern: str) -> bool:
+        return any(c in pattern for c in '*?[')
 
-    def _resolve_templates(self, template_resolver: Optional[Callable[[Match[AnyStr]], AnyStr]]):
-        for _, sect in self._sections.items():
-            sect._resolve_templates(template_resolver)
-
-    def _value_at(self, section, path: [str]):
-        if len(path) == 0:
-            return section
-        if section is None:
-            if path[0] not in self.sections:
-                raise Exception('no such section: {}'.format(path[0]))
-            section = self.sections[path[0]]
-            return self._value_at(section, list(path[1:]))
-
-        if section[path[0]] is None:
-            raise Exception('no such option: {}, in: {}'.format(path[0], section))
-        value = section[path[0]]
-        if isinstance(value, Section):
-            return self._value_at(value, list(path[1:]))
-        if len(path) > 1:
-            raise Exception('illegal path: {}, in: {}'.format(path, section))
+    @staticmethod
+    def _glob_prefix(pattern: str) -> str:
+        for i, c in enumerate(pattern):
+            if c in '*?[':
+                return pattern[:i]
+        return pattern
+
+    def _value_at(self, path: List[str]):
+        if path[0] not in self.headers:
+            raise Exception('no such section: {}'.format(path[0]))
+        value = self._section(path[0])
+        for i in range(1, len(path)):
+            section = value
+            value = section._field(path[i])
+            if value is None:
+                raise Exception('no such option: {}, in: {}'.format(path[i], section))
+            if not isinstance(value, Section) and i + 1 < len(path):
+                raise Exception('illegal path: {}, in: {}'.format(path[i:], section))
         return value
 
+    def _current_index(self) -> Dict[str, Any]:
+        if self._index is None or self._index_generation != _generation:
+            self._index = {}
+            self._index_generation = _generation
+        return self._index
+
+
+class CfgOverlay(Cfg):
+    # view of a base cfg with some fields overridden: the overridden sections and the sections (transitively)
+    # depending on them (inheritance, references, inlined sections) are parsed again & resolved within the view when
+    # first needed, all the other sections are the base's; the base is never modified
+
+    def __init__(self, base: Cfg, overrides: Dict[str, Dict[str, Tuple[bool, Any]]]):
+        if base.parser is None:
+            raise Exception('overlay of a cfg loaded from the disk cache: {}'.format(base.path))
+        super().__init__(base.path, base.parser, lazy=True, registry=base._registry)
+        self._base = base
+        self._overrides = overrides
+        self._affected = None
+        self._headers = base.headers
+        self._templates = base.templates
+        self._cached_cfgs = base._cached_cfgs
+
+    @property
+    def base(self) -> Cfg:
+        return self._base
+
+    @property
+    def overrides(self) -> Dict[str, Any]:
+        return {'{}/{}'.format(identifier, field): value
+                for identifier, fields in self._overrides.items() for field, (_, value) in fields.items()}
+
+    @property
+    def lexer(self) -> Lexer:
+        if self._lexer is None:
+            self._lexer = Lexer(self._parser,
+                                section=lambda key: Section._inline(self, key),
+                                reference=lambda value: Section._reference(self, value),
+                                enum=lambda value: symbols.value('enum', value),
+                                symbol=symbols.value,
+                                bracketed=self._base.lexer.bracketed)
+        return self._lexer
+
+    def overlay(self, overrides: Dict[str, Any], raw: bool = False) -> 'CfgOverlay':
+        # overrides on top of this view's, over the same base
+        merged = {identifier: dict(fields) for identifier, fields in self._overrides.items()}
+        for identifier, fields in CfgOverlay.split_overrides(self._base, overrides, raw).items():
+            merged.setdefault(identifier, {}).update(fields)
+        return CfgOverlay(self._base, merged)
+
+    def reload(self, files: Optional[List[str]] = None) -> List[str]:
+        raise Exception('reload the base cfg: {}'.format(self._path))
+
+    @staticmethod
+    def split_overrides(cfg: Cfg, overrides: Dict[str, Any], raw: bool) -> Dict[str, Dict[str, Tuple[bool, Any]]]:
+        # {'clazz::name/field': value} -> {'clazz::name': {field: (raw, value)}}
+        build = {}
+        for path, value in overrides.items():
+            parts = path.split('/')
+            if len(parts) != 2 or not parts[1]:
+                raise Exception('illegal override path: {}, expected: clazz::name/field'.format(path))
+            if parts[0] not in cfg.headers:
+                raise Exception('no such section: {}'.format(parts[0]))
+            if raw and not isinstance(value, str):
+                raise Exception('raw override is not a string: {}'.format(path))
+            build.setdefault(parts[0], {})[parts[1]] = (raw, value)
+        return build
+
+    # private
+
+    def _lookup(self, identifier: str) -> 'Section':
+        if self._sections is not None:
+            return self._sections[identifier]
+        if identifier not in self._affected_sections():
+            return self._base._lookup(identifier)
+        return self._load_section(identifier)
+
+    def _load_section(self, identifier: str) -> 'Section':
+        if self._loaded is not None and identifier in self._loaded:
+            return self._loaded[identifier]
+        sect = super()._load_section(identifier)
+        for field, (raw, value) in self._overrides.get(identifier, {}).items():
+            if raw:
+                parsed = self.lexer.parse(value.strip())
+                value = self.templates.apply(parsed) if '$(' in value else parsed
+            elif isinstance(value, (list, dict)):
+                value = value.copy()  # merged with inherited dicts in place, nested sections stay shared
+            sect.fields[field] = value
+        return sect
+
+    def _parse_sections(self):
+        return {identifier: self._lookup(identifier) for identifier in self.headers}
+
+    def _affected_sections(self) -> set:
+        if self._affected is None:
+            dependents = self._base._dependents()
+            affected = set(self._overrides)
+            pending = list(affected)
+            while pending:
+                for dependent in dependents.get(pending.pop(), ()):
+                    if dependent not in affected:
+                        affected.add(dependent)
+                        pending.append(dependent)
+            self._affected = affected
+        return self._affected
+
 
 @dataclass
 class _Ref:
@@ -149,32 +894,58 @@ class _Ref:
         return hash(self.path)
 
 
-@dataclass
 class Section:
-    clazz: str = None
-    name: str = None
-    fields: Dict[str, Any] = None
-
-    _superclass_id = None
-    _super = None
-    _all_fields: Dict[str, Any] = None
-
-    def __post_init__(self):
-        m = _SUPERCLASS_PATTERN.match(self.name)
-        if m:
-            value = m[1]
-            if '::' not in value:
-                self._superclass_id = self.clazz + '::' + value
-            else:
-                self._superclass_id = value
-            self.name = self.name[:-(len(value) + 2)]
+    # fields holds the section's own (overriding) values only, inherited ones are looked up through the superclass
+    # chain; fields are exposed as attributes by __getattr__, there is no other copy of the values
+
+    __slots__ = ('clazz', 'name', 'fields', '_superclass_id', '_dependencies', '_super', '_composed', '_state',
+                 '_resolved_fields', '_shared', '_file')
+
+    def __init__(self, clazz: str = None, name: str = None, fields: Dict[str, Any] = None):
+        self.clazz = clazz
+        self.fields = fields
+        self.name, self._superclass_id = Section._split_superclass(clazz, name)
+        self._dependencies = None
+        self._super = None
+        self._composed = False
+        self._state = _PARSED
+        self._resolved_fields = None  # resolved before the whole section is (through field references)
+        self._shared = False  # of a cfg handed out by a registry: read-only
+        self._file = None  # path of the cfg which parsed the section
+
+    def __getattr__(self, name):
+        # called for fields only (and unset slots)
+        if name.startswith('_') or name in _SLOTS:
+            raise AttributeError(name)
+        if self._state != _RESOLVED:
+            self.resolve()
+        layer = self._layer(name)
+        if layer is None:
+            raise AttributeError(name)
+        return layer.fields[name]
 
     def __setattr__(self, name, value):
-        super().__setattr__(name, value)
-        if name != 'name' and name != 'clazz' and name != 'fields' and not name.startswith('_'):
-            self._all_fields[name] = value
-            if name in self.fields:
-                self.fields[name] = value
+        if getattr(self, '_shared', False) and not name.startswith('_'):
+            raise Exception('section of a shared cfg is read-only: {}, use cfg.overlay(...) or a private '
+                            'CfgRegistry'.format(self.identifier))
+        if name in _SLOTS:
+            object.__setattr__(self, name, value)
+            if name.startswith('_'):
+                return
+        else:
+            self.fields[name] = value
+        if getattr(self, '_state', _PARSED) == _RESOLVED:  # (slots are unset while unpickling)
+            _changed()
+
+    def __getstate__(self):
+        # the read-only flag belongs to the cfg holding the section, it isn't pickled
+        return None, {slot: getattr(self, slot) for slot in Section.__slots__
+                      if slot != '_shared' and hasattr(self, slot)}
+
+    def __setstate__(self, state):
+        for slot, value in state[1].items():
+            object.__setattr__(self, slot, value)
+        object.__setattr__(self, '_shared', False)
 
     def __setitem__(self, item, value):
         if isinstance(item, str):
@@ -183,15 +954,12 @@ class Section:
             elif item == 'clazz':
                 self.clazz = value
             else:
-                if item in self.fields:
-                    self.fields[item] = value
-                self._all_fields[item] = value
-                self._set_attrs()
+                setattr(self, item, value)
         else:
             raise Exception("assignment not supported for: {}".format(item))
 
     def __getitem__(self, item):
-        if self._all_fields is None:
+        if self._state != _RESOLVED:
             self.resolve()
 
         if isinstance(item, int):
@@ -199,25 +967,29 @@ class Section:
                 return 'clazz'
             if item == 1:
                 return 'name'
-            return list(self._all_fields.keys())[item - 2]
+            return list(self.all_fields.keys())[item - 2]
 
-        path = item.split('/')
-        if len(path) == 1:
-            if item == 'clazz':
-                return self.clazz
-            if item == 'name':
-                return self.name
-            if item not in self._all_fields:
+        if '/' not in item:
+            return self._field(item)
+        value = self
+        for field in item.split('/'):
+            if not isinstance(value, Section):
                 return None
-            return self.all_fields[item]
-        else:
-            ref = self[path[0]]
-            if isinstance(ref, Section):
-                return ref['/'.join(path[1:])]
-            return None
+            value = value._field(field)
+        return value
 
     def __len__(self):
-        return 2 + len(self._all_fields) if self._all_fields is not None else 0
+        return 2 + len(self.all_fields) if self._composed else 0
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.clazz, self.name, self.fields) == (other.clazz, other.name, other.fields)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Section(clazz={!r}, name={!r}, fields={!r})'.format(self.clazz, self.name, self.fields)
 
     @property
     def identifier(self) -> str:
@@ -225,14 +997,23 @@ class Section:
 
     @property
     def all_fields(self) -> Dict[str, Any]:
-        if self._all_fields is None:
+        # own and inherited fields flattened (in the order of definition, the top-most superclass first)
+        if not self._composed:
             raise Exception('illegal state')
-        return self._all_fields
+        layers = []
+        sect = self
+        while sect is not None:
+            layers.append(sect.fields)
+            sect = sect._super
+        build = {}
+        for layer in reversed(layers):
+            build.update(layer)
+        return build
 
     @property
     def to_dict(self):
         build = {'name': self.name, 'clazz': self.clazz}
-        for k, v in self._all_fields.items():
+        for k, v in self.all_fields.items():
             if isinstance(v, Section):
                 build[k] = v.to_dict
             else:
@@ -245,72 +1026,231 @@ class Section:
     # inner
 
     def resolve(self):
-        self._resolve_super()
-
-        self._resolve_fields()
-
-        for field, value in self._all_fields.copy().items():
-            self._all_fields[field] = Section._resolve_ref(value)
+        if self._state != _RESOLVED:
+            Section.resolve_all([self])
 
-        self._resolve_templates()
-        self._set_attrs()
+    @staticmethod
+    def resolve_all(sections: List['Section']):
+        # one resolver run for all the sections, every section is resolved once (resolved ones are skipped)
+        Section._run(Section._each(sections))
 
     # private
 
-    def _resolve_fields(self):
-        if self._all_fields is not None:
-            return
+    def _steps(self):
+        # resolution of the section: the superclass first, then every field
+        count_resolve(self._file, self.identifier)
+        self._state = _RESOLVING
+        self._compose()
         if self._super is not None:
-            parent = self._resolve_super()
-            parent._resolve_fields()
-            self._all_fields = parent._all_fields.copy()
+            yield _SECTION, self._super  # inherited fields are resolved by the superclass
+        fields = self.fields
+        for field in list(fields):
+            # plain values don't need a node of their own
+            if isinstance(fields[field], (_Ref, list, dict, Section)):
+                yield _FIELD, self, field
+        self._state = _RESOLVED
+        self._resolved_fields = None
+
+    def _field_steps(self, field: str):
+        # resolution of a single field, an inherited one is resolved by the superclass holding it
+        if field not in self.fields:
+            yield _FIELD, self._super, field
         else:
-            self._all_fields = {}
-
-        for field, value in self.fields.items():
-            if field in self._all_fields:
-                existed = self._all_fields[field]
-                if isinstance(existed, dict):
-                    value.update(existed)
-            self._all_fields[field] = value
-
-    def _resolve_templates(self, template_resolver: Optional[Callable[[Match[AnyStr]], AnyStr]] = None):
-        if template_resolver is None:
-            template_resolver = self._template_resolver
-
-        for field, value in self._all_fields.copy().items():
-            if isinstance(value, str):
-                self._all_fields[field] = _TEMPLATE_PATTERN.sub(template_resolver, value)
-
-    def _resolve_super(self) -> 'Section':
-        if self._super and isinstance(self._super, _Ref):
-            self._super = self._super.cfg[self._super.path]
-            return self._resolve_super()
-        return self._super
-
-    def _set_attrs(self):
-        # note: this will resolve a whole inheritance branch
-        for field, value in self._all_fields.items():
-            if isinstance(value, Section):
-                value._set_attrs()
-            setattr(self, field, value)  # <-- punch line
+            self.fields[field] = yield from Section._value_steps(self.fields[field])
+        if self._resolved_fields is None:
+            self._resolved_fields = set()
+        self._resolved_fields.add(field)
+
+    def _compose(self):
+        # links the inheritance chain (iteratively, from the top-most superclass down) and merges inherited dicts
+        if self._composed:
+            return
+        chain = []
+        visited = set()
+        sect = self
+        while sect is not None and not sect._composed:
+            if id(sect) in visited:
+                raise Exception('inheritance cycle: {}'.format(
+                    ' -> '.join([s.identifier for s in chain] + [sect.identifier])))
+            visited.add(id(sect))
+            chain.append(sect)
+            if isinstance(sect._super, _Ref):
+                if sect._super.path not in sect._super.cfg.headers:
+                    raise Exception('no such section: {}, superclass of: {}'.format(sect._super.path, sect.identifier))
+                sect._super = sect._super.cfg._lookup(sect._super.path)
+            sect = sect._super
+
+        for sect in reversed(chain):
+            if sect._super is not None:
+                for field, value in sect.fields.items():
+                    if isinstance(value, dict):
+                        layer = sect._super._layer(field)
+                        if layer is not None and isinstance(layer.fields[field], dict):
+                            value.update(layer.fields[field])
+            sect._composed = True
+
+    def _layer(self, field: str) -> Optional['Section']:
+        # the nearest section of the (composed) inheritance chain defining the field
+        sect = self
+        while sect is not None:
+            if field in sect.fields:
+                return sect
+            sect = sect._super
+        return None
+
+    def _field(self, field: str):
+        if self._state != _RESOLVED:
+            self.resolve()
+        layer = self._layer(field)
+        if layer is not None:
+            return layer.fields[field]
+        if field == 'clazz':
+            return self.clazz
+        if field == 'name':
+            return self.name
+        return None
+
+    # resolver
+
+    @staticmethod
+    def _run(steps):
+        # drives `steps` (a generator yielding the nodes it depends on) and returns its result; every yielded node
+        # is resolved before the generator is resumed, depth-first on an explicit stack - the nodes are visited in
+        # topological order, each one once, and a node met again while it is still being resolved is a cycle
+        with _lock, phase('resolve'):
+            stack = [(None, steps)]
+            visiting = {}
+            try:
+                while True:
+                    node, gen = stack[-1]
+                    try:
+                        dependency = next(gen)
+                    except StopIteration as stop:
+                        stack.pop()
+                        if node is None:
+                            return stop.value
+                        del visiting[Section._node_key(node)]
+                        continue
+
+                    sect = dependency[1]
+                    if sect._state == _RESOLVED:
+                        continue
+                    if dependency[0] == _FIELD and sect._resolved_fields and dependency[2] in sect._resolved_fields:
+                        continue
+                    key = Section._node_key(dependency)
+                    if key in visiting:
+                        chain = [Section._node_name(n) for n, _ in stack[visiting[key]:]]
+                        raise Exception('reference cycle: {}'.format(
+                            ' -> '.join(chain + [Section._node_name(dependency)])))
+                    visiting[key] = len(stack)
+                    if dependency[0] == _SECTION:
+                        stack.append((dependency, sect._steps()))
+                    else:
+                        stack.append((dependency, sect._field_steps(dependency[2])))
+            except BaseException:
+                for node, _ in stack:
+                    if node is not None and node[0] == _SECTION and node[1]._state == _RESOLVING:
+                        node[1]._state = _PARSED
+                raise
+
+    @staticmethod
+    def _each(sections: List['Section']):
+        for sect in sections:
+            yield _SECTION, sect
+
+    @staticmethod
+    def _value_steps(value: Any):
+        # resolves references in the value (in place for lists & dicts), sections found in it are resolved too
+        if isinstance(value, _Ref):
+            count('refs_resolved')
+            return (yield from Section._ref_steps(value))
+        if isinstance(value, list):
+            for i, inner_value in enumerate(value):
+                if isinstance(inner_value, (_Ref, list, dict, Section)):
+                    value[i] = yield from Section._value_steps(inner_value)
+        elif isinstance(value, dict):
+            for key, inner_value in value.items():
+                if isinstance(inner_value, (_Ref, list, dict, Section)):
+                    value[key] = yield from Section._value_steps(inner_value)
+        elif isinstance(value, Section):
+            yield _SECTION, value
+        return value
+
+    @staticmethod
+    def _ref_steps(ref: _Ref):
+        # follows 'clazz::name/field/...' resolving only the fields along the path
+        cfg = ref.cfg
+        path = ref.path.split('/')
+        if path[0] not in cfg.headers:
+            raise Exception('no such section: {}'.format(path[0]))
+        value = cfg._lookup(path[0])
+        for i, field in enumerate(path[1:]):
+            sect = value
+            sect._compose()
+            layer = sect._layer(field)
+            if layer is not None:
+                yield _FIELD, layer, field
+                value = layer.fields[field]
+            elif field == 'clazz' or field == 'name':
+                value = getattr(sect, field)
+            else:
+                value = None
+            if value is None:
+                raise Exception('no such option: {}, in: {}'.format(field, sect))
+            if not isinstance(value, Section) and i + 2 < len(path):
+                raise Exception('illegal path: {}, in: {}'.format(path[i + 1:], sect))
+        if isinstance(value, Section):
+            yield _SECTION, value
+        return value
+
+    @staticmethod
+    def _node_key(node: tuple) -> tuple:
+        return (node[0], id(node[1])) + node[2:]
+
+    @staticmethod
+    def _node_name(node: tuple) -> str:
+        if node[0] == _SECTION:
+            return node[1].identifier
+        return '{}/{}'.format(node[1].identifier, node[2])
 
     # helpers
 
     @staticmethod
-    def _template_resolver(match: Match[AnyStr]) -> str:
-        template = match[1]
-        if template == 'TIMESTAMP':
-            return "{}".format(time.strftime("%Y%m%d_%H%M%S"))
-        elif template == 'UUID':
-            return str(uuid.uuid4())
-        return match[0]
+    def _freeze(value: Any, memo: Dict[int, Any]) -> Any:
+        # deep, immutable copy: sections -> FrozenSection, lists -> tuples, dicts -> read-only mappings; shared objects
+        # stay shared (memo: id -> frozen copy), walked iteratively (post-order) so deep nesting is fine
+        def children(v):
+            if isinstance(v, Section):
+                return v.all_fields.values()
+            if isinstance(v, list):
+                return v
+            return v.values()
+
+        def frozen(v):
+            return memo[id(v)] if isinstance(v, (Section, list, dict)) else v
+
+        stack = [(value, False)]
+        while stack:
+            v, expanded = stack.pop()
+            if not isinstance(v, (Section, list, dict)) or id(v) in memo:
+                continue
+            if not expanded:
+                stack.append((v, True))
+                stack.extend((child, False) for child in children(v))
+            elif isinstance(v, Section):
+                memo[id(v)] = FrozenSection(v.clazz, v.name, MappingProxyType(
+                    {field: frozen(inner) for field, inner in v.all_fields.items()}))
+            elif isinstance(v, list):
+                memo[id(v)] = tuple(frozen(inner) for inner in v)
+            else:
+                memo[id(v)] = MappingProxyType({key: frozen(inner) for key, inner in v.items()})
+        return frozen(value)
 
     @staticmethod
     def resolve_reference(cfg: Cfg, qualifier: str):
         ref = Section._reference(cfg, qualifier, only_other=True)
         if ref:
-            return Section._resolve_ref(ref)
+            return Section._run(Section._value_steps(ref))
         return None
 
     @staticmethod
@@ -327,103 +1267,43 @@ class Section:
         if name is None:
             raise Exception("wrong section identifier: {}".format(key))
 
-        for key in sorted(sect.keys()):
-            value = sect[key].strip()
-            build[key] = Section._parse_item(cfg, value, parser)
-
-        created = Section(domain, name, build)
-        if created._superclass_id:
-            created._super = Section._reference(cfg, created._superclass_id)
+        count('sections_parsed')
+        with phase('parse'):
+            for key in sorted(sect.keys()):
+                value = sect[key].strip()
+                build[key] = cfg.lexer.parse(value)
+                if '$(' in value:
+                    with phase('templates'):
+                        build[key] = cfg.templates.apply(build[key])
+
+            created = Section(domain, name, build)
+            created._shared = cfg._shared
+            created._file = cfg.path
+            if created._superclass_id:
+                created._super = Section._reference(cfg, created._superclass_id)
+            created._dependencies = Section._collect_dependencies(created)
         return created
 
     @staticmethod
-    def _parse_array(cfg: Cfg, items: [any], parser: configparser.ConfigParser):
-        build = []
-        for item in items:
-            value = item.strip()
-            build.append(Section._parse_item(cfg, value, parser))
-        return build
+    def _inline(cfg: Cfg, key: str) -> _Ref:
+        # a value naming a section of the same file stands for the (single, lazily parsed) section itself
+        clazz, name, _ = Section.split_key(key)
+        return _Ref(cfg, '{}::{}'.format(clazz, name))
 
     @staticmethod
-    def _parse_dict(cfg: Cfg, items: [any], parser: configparser.ConfigParser):
-        build = {}
-        for item in items:
-            kv = item.strip()
-            key, value = kv.split('=>', 1)
-            m = re.match(_QUOTED_PATTERN, key.strip())
-            if m:
-                key = Section._unescape(m.group(1)) if m.group(1) is not None else Section._unescape(m.group(2))
-
-            build[key.strip()] = Section._parse_item(cfg, value.strip(), parser)
-        return build
-
-    @staticmethod
-    def _parse_item(cfg: Cfg, value: any, parser: configparser.ConfigParser):
-        if value in parser:
-            return Section.parse(cfg, value)
-
-        m = re.match(_QUOTED_PATTERN, value)
-        if m:
-            return Section._unescape(m.group(1)) if m.group(1) is not None else Section._unescape(m.group(2))
-        m = re.match(_RE_PATTERN, value)
-        if m:
-            return re.compile(m.group(1))
-        m = re.match(_ENUM_PATTERN, value)
-        if m:
-            return Section._enum_value(m.group(1))
-        if re.match(_NONE_PATTERN, value):
-            return None
-        if re.match(_INT_PATTERN, value):
-            return int(value)
-        if re.match(_INT_EXP_PATTERN, value):
-            return int(float(value))
-        if re.match(_FLOAT_PATTERN, value):
-            return float(value)
-        if re.match(_FLOAT_PATTERN_2, value):
-            return float(value)
-        if re.match(_BOOL_PATTERN, value.lower()):
-            return Section._bool_value(value)
-        if value.startswith('[') and value.endswith(']'):
-            # array
-            expression = value[1:-1]
-            return Section._parse_array(cfg, Section._split_expression(expression, check=True), parser)
-        if value.startswith('{') and value.endswith('}'):
-            # dictionary
-            expression = value[1:-1]
-            return Section._parse_dict(cfg, Section._split_expression(expression, check=True), parser)
-        ref = Section._reference(cfg, value)
-        if ref is not None:
-            return ref
-        return Section._unescape(value).strip()
-
-    @staticmethod
-    def _resolve_ref(value: any):
-        if isinstance(value, _Ref):
-            return Section._resolve_ref(value.cfg[value.path])
-        if isinstance(value, list):
-            for i, inner_value in enumerate(value.copy()):
-                if isinstance(inner_value, _Ref):
-                    value[i] = Section._resolve_ref(inner_value)
-                elif isinstance(inner_value, list):
-                    value[i] = Section._resolve_ref(inner_value)
-                elif isinstance(inner_value, dict):
-                    value[i] = Section._resolve_ref(inner_value)
-                elif isinstance(inner_value, Section):
-                    inner_value.resolve()
-        elif isinstance(value, dict):
-            for key, inner_value in value.items():
-                if isinstance(inner_value, _Ref):
-                    value[key] = Section._resolve_ref(inner_value)
-                elif isinstance(inner_value, list):
-                    value[key] = Section._resolve_ref(inner_value)
-                elif isinstance(inner_value, dict):
-                    value[key] = Section._resolve_ref(inner_value)
-                elif isinstance(inner_value, Section):
-                    inner_value.resolve()
-        elif isinstance(value, Section):
-            value.resolve()
-            return value
-        return value
+    def _collect_dependencies(sect: 'Section') -> frozenset:
+        # (absolute path, section identifier) of the superclass, referenced and inlined sections
+        build = set()
+        pending = [sect._super] + list(sect.fields.values())
+        while pending:
+            value = pending.pop()
+            if isinstance(value, _Ref):
+                build.add((os.path.abspath(value.cfg.path), value.path.split('/')[0]))
+            elif isinstance(value, list):
+                pending.extend(value)
+            elif isinstance(value, dict):
+                pending.extend(value.values())
+        return frozenset(build)
 
     @staticmethod
     def _reference(cfg: Cfg, qualifier: str, only_other: bool = False) -> Optional[_Ref]:
@@ -446,58 +1326,23 @@ class Section:
         return _Ref(cfg, qualifier)
 
     @staticmethod
-    def _unescape(value: str) -> str:
-        build = ""
-        escaped = False
-        for char in value:
-            if char == '\\' and not escaped:
-                escaped = True
-                continue
-            build += char
-        return build
+    def split_key(key: str) -> (str, str, Optional[str]):
+        # 'a::2(1)' -> ('a', '2', 'a::1')
+        clazz, name = Section._split_at_2colons(key)
+        if name is None:
+            raise Exception("wrong section identifier: {}".format(key))
+        name, superclass_id = Section._split_superclass(clazz, name)
+        return clazz, name, superclass_id
 
     @staticmethod
-    def _split_expression(expression: str, check: bool = False) -> [str]:
-        build = []
-        item = ""
-        capture_until = []
-        escaped = ''
-        quoted = False
-        for char in expression:
-            if char == '\\' and not escaped:
-                item += char
-                escaped = True
-                continue
-            if escaped:
-                item += char
-                escaped = False
-                continue
-
-            if char == '[' and not quoted:
-                capture_until.append(']')
-            elif char == '{' and not quoted:
-                capture_until.append('}')
-            elif (char == '\'' or char == '"') and not quoted:
-                capture_until.append(char)
-                quoted = True
-            elif quoted and char == capture_until[-1]:
-                quoted = False
-                capture_until.pop()
-            elif len(capture_until) > 0 and char == capture_until[-1]:
-                capture_until.pop()
-            elif len(capture_until) == 0 and char == ',':
-                item = item.strip()
-                if len(item) > 0:
-                    build.append(item)
-                    item = ""
-                continue
-            item += char  # capture
-
-        item = item.strip()
-        if len(item) > 0:
-            build.append(item)
-
-        return build
+    def _split_superclass(clazz: str, name: str) -> (str, Optional[str]):
+        m = _SUPERCLASS_PATTERN.match(name)
+        if not m:
+            return name, None
+        value = m[1]
+        if '::' not in value:
+            return name[:-(len(value) + 2)], clazz + '::' + value
+        return name[:-(len(value) + 2)], value
 
     @staticmethod
     def _split_at_2colons(key: str) -> (str, str):
@@ -517,27 +1362,5 @@ class Section:
             return None
         return parts[0].strip(), parts[1].strip()
 
-    @staticmethod
-    def _bool_value(token: Optional[str], default=False) -> bool:
-        if token is None:
-            return default
-        return token.lower() == 'true'
 
-    @staticmethod
-    def _enum_value(value: str) -> Enum:
-        parts = value.rsplit('.', 1)
-        constructor = Section._constructor(parts[0])
-        return constructor(parts[1])
-
-    @staticmethod
-    def _constructor(name: str):
-        parts = name.split('.')
-        if len(parts) == 1:
-            return globals()[parts[0]]
-        mod = None
-        for part in parts[:-1]:
-            if mod is None:
-                mod = __import__(part)
-            else:
-                mod = getattr(mod, part)
-        return getattr(mod, parts[-1])
+_SLOTS = frozenset(Section.__slots__)
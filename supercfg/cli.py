@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from supercfg.cfg import Cfg
+from supercfg.search import SearchPath
+
+# supercfg check <dir>: parses & resolves every section of every .cfg file under the dir, files are checked in
+# parallel (a process per core) and all the errors are reported with their file & section, with the time per file
+
+
+def check_file(path: str) -> Dict[str, Any]:
+    # {'file', 'seconds', 'sections', 'errors': [{'section', 'error'}]}, a section None is an error of the file itself
+    start = time.perf_counter()
+    errors = []
+    sections = 0
+    try:
+        cfg = Cfg.parse(path, lazy=True)
+        for identifier in cfg.headers:
+            sections += 1
+            try:
+                cfg[identifier]  # noqa
+            except Exception as e:
+                errors.append({'section': identifier, 'error': _message(e)})
+    except Exception as e:
+        errors.append({'section': None, 'error': _message(e)})
+    return {'file': path, 'seconds': time.perf_counter() - start, 'sections': sections, 'errors': errors}
+
+
+def check(root: str, workers: Optional[int] = None, search: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    # reports of all the .cfg files under the root (see check_file), in path order; workers=1 checks in this process;
+    # search: dirs of the search path for @ references
+    if not os.path.isdir(root):
+        raise Exception('no such dir: {}'.format(root))
+    files = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        files.extend(os.path.join(dir_path, name) for name in sorted(file_names) if name.endswith('.cfg'))
+
+    if workers == 1 or len(files) < 2:
+        _init(search)
+        return [check_file(file) for file in files]
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init, initargs=(search,)) as pool:
+        return list(pool.map(check_file, files, chunksize=max(1, len(files) // (workers * 4))))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='supercfg', description='supercfg tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+    check_parser = commands.add_parser('check', help='parse & resolve every section of the .cfg files under a dir')
+    check_parser.add_argument('dir')
+    check_parser.add_argument('--workers', type=int, help='processes (default: number of cores, 1: no subprocesses)')
+    check_parser.add_argument('--path', action='append', help='search path dir for @ references (repeatable)')
+    check_parser.add_argument('--slowest', type=int, default=10, help='number of slowest files listed')
+    check_parser.add_argument('--json', action='store_true', help='print the reports as json')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        reports = check(args.dir, args.workers, args.path)
+    except Exception as e:
+        print('error: {}'.format(e), file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+    errors = sum(len(report['errors']) for report in reports)
+
+    if args.json:
+        print(json.dumps({'seconds': elapsed, 'errors': errors, 'files': reports}, indent=2))
+        return 1 if errors else 0
+
+    for report in reports:
+        if report['errors']:
+            print('FAIL {:>8.3f}s  {}'.format(report['seconds'], report['file']))
+            for error in report['errors']:
+                print('  {}: {}'.format(error['section'] or '-', error['error']))
+    slowest = sorted(reports, key=lambda r: r['seconds'], reverse=True)[:args.slowest]
+    if slowest:
+        print('slowest:')
+        for report in slowest:
+            print('  {:>8.3f}s  {:>5} sections  {}'.format(report['seconds'], report['sections'], report['file']))
+    print('{} files, {} sections, {} errors in {:.2f}s'.format(
+        len(reports), sum(report['sections'] for report in reports), errors, elapsed))
+    return 1 if errors else 0
+
+
+# private
+
+def _init(search: Optional[List[str]]):
+    if search:
+        SearchPath.set_default(SearchPath(search))
+
+
+def _message(e: Exception) -> str:
+    return str(e) if type(e) is Exception else '{}: {}'.format(type(e).__name__, e)
@@ -0,0 +1,132 @@
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+
+
+class FrozenSection:
+    # deeply immutable copy of a resolved section: lists are tuples, dicts are read-only mappings, nested sections
+    # are frozen too (shared ones stay shared); reads never modify anything, so they need no locking
+
+    __slots__ = ('clazz', 'name', '_fields')
+
+    def __init__(self, clazz: str, name: str, fields: Mapping[str, Any]):
+        object.__setattr__(self, 'clazz', clazz)
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, '_fields', fields)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self._fields[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise Exception('assignment not supported, frozen section: {}'.format(self.identifier))
+
+    def __setitem__(self, item, value):
+        raise Exception('assignment not supported, frozen section: {}'.format(self.identifier))
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            if item == 0:
+                return 'clazz'
+            if item == 1:
+                return 'name'
+            return list(self._fields.keys())[item - 2]
+
+        value = self
+        for field in item.split('/'):
+            if not isinstance(value, FrozenSection):
+                return None
+            value = value._field(field)
+        return value
+
+    def __len__(self):
+        return 2 + len(self._fields)
+
+    def __repr__(self):
+        return 'FrozenSection(clazz={!r}, name={!r}, fields={!r})'.format(self.clazz, self.name, dict(self._fields))
+
+    @property
+    def identifier(self) -> str:
+        return '{}::{}'.format(self.clazz, self.name)
+
+    @property
+    def all_fields(self) -> Mapping[str, Any]:
+        return self._fields
+
+    @property
+    def to_dict(self):
+        # a mutable copy
+        build = {'name': self.name, 'clazz': self.clazz}
+        for k, v in self._fields.items():
+            build[k] = FrozenSection._thaw(v)
+        return build
+
+    def get(self, key: str, default_value):
+        return self[key] if self[key] is not None else default_value
+
+    # private
+
+    def _field(self, field: str):
+        value = self._fields.get(field)
+        if value is not None or field in self._fields:
+            return value
+        if field == 'clazz':
+            return self.clazz
+        if field == 'name':
+            return self.name
+        return None
+
+    @staticmethod
+    def _thaw(value: Any) -> Any:
+        if isinstance(value, FrozenSection):
+            return value.to_dict
+        if isinstance(value, tuple):
+            return [FrozenSection._thaw(v) for v in value]
+        if isinstance(value, MappingProxyType):
+            return {k: FrozenSection._thaw(v) for k, v in value.items()}
+        return value
+
+
+class FrozenCfg:
+    # immutable snapshot of a fully resolved cfg (see Cfg.freeze()), safe to share between threads and to keep
+    # across fork() (with gc.freeze()) without touching its pages
+
+    __slots__ = ('path', 'sections')
+
+    def __init__(self, path: str, sections: Mapping[str, FrozenSection]):
+        object.__setattr__(self, 'path', path)
+        object.__setattr__(self, 'sections', sections)
+
+    def __setattr__(self, name, value):
+        raise Exception('assignment not supported, frozen cfg: {}'.format(self.path))
+
+    def __getitem__(self, item):
+        path = item.split('/')
+        if path[0] not in self.sections:
+            raise Exception('no such section: {}'.format(path[0]))
+        value = self.sections[path[0]]
+        for i in range(1, len(path)):
+            section = value
+            value = section._field(path[i])
+            if value is None:
+                raise Exception('no such option: {}, in: {}'.format(path[i], section))
+            if not isinstance(value, FrozenSection) and i + 1 < len(path):
+                raise Exception('illegal path: {}, in: {}'.format(path[i:], section))
+        return value
+
+    def __contains__(self, identifier: str):
+        return identifier in self.sections
+
+    def __repr__(self):
+        return 'FrozenCfg({!r})'.format(self.path)
+
+    def accessor(self, path: str) -> Callable[[], Any]:
+        # the value never changes
+        value = self[path]
+        return lambda: value
+
+    def options(self, section: str) -> FrozenSection:
+        return self.sections[section]
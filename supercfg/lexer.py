@@ -0,0 +1,255 @@
+import re
+from typing import Callable, Container, Optional, Any, Tuple
+
+# runs of characters without meaning for the scanner (outside of quotes), inside of quotes
+_PLAIN = re.compile(r'[^\\\[\]{}\'",=]+')
+_QUOTED = {"'": re.compile(r"[^\\']+"), '"': re.compile(r'[^\\"]+')}
+_SPACE = re.compile(r'\s*')
+_NUMBER = re.compile(r'[+-]?(?:(?P<int>[0-9_]+)|(?P<exp>[0-9_]+e[+-]?[0-9_]+)'
+                     r'|(?P<float>[0-9_]*\.[0-9_]*(?:e[+-]?[0-9_]+)?))')
+_NUMBER_START = frozenset('+-0123456789_.')
+_CLOSERS = {'[': ']', '{': '}'}
+_NONE = ('None', 'none', 'NONE')
+_SYMBOLS = (('class', 'class:'), ('callable', 'callable:'))
+_MISSING = object()
+
+
+class Lexer:
+    # single pass value parser: dispatches on the first character, nested arrays/dicts are built while scanning,
+    # elements are never split out and re-scanned (only malformed input falls back to a rescan)
+
+    def __init__(self,
+                 sections: Container[str],
+                 section: Callable[[str], Any],
+                 reference: Callable[[str], Any],
+                 enum: Callable[[str], Any],
+                 symbol: Optional[Callable[[str, str], Any]] = None,
+                 bracketed: Optional[bool] = None):
+        self._sections = sections
+        self._section = section
+        self._reference = reference
+        self._enum = enum
+        self._symbol = symbol  # class:/callable: values, (kind, dotted path) -> value
+        if bracketed is None:
+            bracketed = any(key[:1] in ('[', '{') for key in sections)
+        self._bracketed = bracketed
+        self._interned = {}
+
+    @property
+    def bracketed(self) -> bool:
+        # some section key starts with a bracket (such values need a lookup before being scanned as collections)
+        return self._bracketed
+
+    def parse(self, value: str) -> Any:
+        # value: stripped option value (or element of a collection); immutable results are interned, equal values
+        # share a single object (lists & dicts are resolved in place, they are always built anew)
+        parsed = self._interned.get(value, _MISSING)
+        if parsed is not _MISSING:
+            return parsed
+        parsed = self._parse(value)
+        if not isinstance(parsed, (list, dict)):
+            self._interned[value] = parsed
+        return parsed
+
+    # private
+
+    def _parse(self, value: str) -> Any:
+        if value in self._sections:
+            return self._section(value)
+        if not value:
+            return value
+
+        c = value[0]
+        if c == "'" or c == '"':
+            quoted = Lexer._quoted(value)
+            if quoted is not None:
+                return quoted
+        elif c == 'p':
+            group = Lexer._prefixed(value, 'pattern:')
+            if group is not None:
+                return re.compile(group)
+        elif c == 'e':
+            group = Lexer._prefixed(value, 'enum:')
+            if group is not None:
+                return self._enum(group)
+        elif c == 'c' and self._symbol is not None:
+            for kind, prefix in _SYMBOLS:
+                group = Lexer._prefixed(value, prefix)
+                if group is not None:
+                    return self._symbol(kind, group)
+
+        if value.startswith(_NONE):
+            return None
+        if c in _NUMBER_START:
+            m = _NUMBER.fullmatch(value)
+            if m:
+                if m.group('int') is not None:
+                    return int(value)
+                if m.group('exp') is not None:
+                    return float(value) if 'e-' in value else int(float(value))
+                return float(value)
+        if len(value) in (4, 5) and c in 'tTfF':
+            lower = value.lower()
+            if lower == 'true' or lower == 'false':
+                return lower == 'true'
+        if c in _CLOSERS and value[-1] == _CLOSERS[c]:
+            scanned = self._collection(value, 0, len(value))
+            if scanned is None or scanned[1] != len(value):
+                # malformed nesting (e.g. '[a] [b]'), scan the inside as a plain expression
+                scanned = self._items(value, 1, len(value) - 1, None, c == '{')
+            return self._build(scanned[0])
+        if '::' in value:
+            ref = self._reference(value)
+            if ref is not None:
+                return ref
+        return unescape(value).strip()
+
+    def _build(self, node: Tuple[bool, list]) -> Any:
+        is_dict, entries = node
+        if is_dict:
+            build = {}
+            for key, value in entries:
+                if key is None:
+                    raise ValueError('illegal dict item: {}'.format(value))
+                build[key] = self._build(value) if isinstance(value, tuple) else self.parse(value)
+            return build
+        return [self._build(item) if isinstance(item, tuple) else self.parse(item) for item in entries]
+
+    def _collection(self, text: str, start: int, stop: int) -> Optional[Tuple[Tuple[bool, list], int]]:
+        # text[start] is '[' or '{'; returns (node, index after the matching closer) or None if it is not closed
+        c = text[start]
+        return self._items(text, start + 1, stop, _CLOSERS[c], c == '{')
+
+    def _items(self, text: str, i: int, stop: int, closer: Optional[str], is_dict: bool):
+        # scans comma separated items up to the closer (or stop), nested collections are scanned in place;
+        # nothing is evaluated here, so a collection that turns out to be malformed has no side effects
+        entries = []
+        while True:
+            seg = i
+            i = _SPACE.match(text, i, stop).end()
+            child = None
+            child_end = -1
+            arrow = text.find('=>', seg, stop) if is_dict else -1
+
+            if not is_dict and i < stop and text[i] in _CLOSERS:
+                scanned = self._collection(text, i, stop)
+                if scanned is None:
+                    if closer is not None:
+                        return None
+                    i = stop  # an unclosed bracket swallows the rest of the expression
+                else:
+                    child, i = scanned
+                    child_end = i
+
+            stack = []
+            quoted = False
+            escaped = False
+            closed = False
+            while i < stop:
+                ch = text[i]
+                if escaped:
+                    escaped = False
+                    i += 1
+                elif ch == '\\':
+                    escaped = True
+                    i += 1
+                elif quoted:
+                    if ch == stack[-1]:
+                        stack.pop()
+                        quoted = False
+                        i += 1
+                    else:
+                        i = _QUOTED[stack[-1]].match(text, i, stop).end()
+                elif ch == '[' or ch == '{':
+                    stack.append(_CLOSERS[ch])
+                    i += 1
+                elif ch == "'" or ch == '"':
+                    stack.append(ch)
+                    quoted = True
+                    i += 1
+                elif stack and ch == stack[-1]:
+                    stack.pop()
+                    i += 1
+                elif not stack and ch == closer:
+                    closed = True
+                    break
+                elif not stack and ch == ',':
+                    break
+                elif not stack and i == arrow and child_end < 0:
+                    i = _SPACE.match(text, i + 2, stop).end()
+                    if i < stop and text[i] in _CLOSERS:
+                        scanned = self._collection(text, i, stop)
+                        if scanned is None:
+                            if closer is not None:
+                                return None
+                            i = stop
+                        else:
+                            child, i = scanned
+                            child_end = i
+                else:
+                    m = _PLAIN.match(text, i, stop)
+                    i = m.end() if m else i + 1
+
+            end = i
+            if closer is not None and not closed and end >= stop:
+                return None  # hit the end of the text before the closer
+
+            item = text[seg:end].strip()
+            if item:
+                if is_dict:
+                    entries.append(self._dict_item(item, text, arrow, end, child, child_end))
+                elif self._is_child(item, text, end, child_end):
+                    entries.append(child)
+                else:
+                    entries.append(item)
+
+            if closed:
+                return (is_dict, entries), end + 1
+            if end >= stop:
+                return (is_dict, entries), end
+            i = end + 1
+
+    def _dict_item(self, item: str, text: str, arrow: int, end: int, child: Any, child_end: int):
+        if arrow < 0 or arrow >= end:
+            return None, item
+        key, value = item.split('=>', 1)
+        key = key.strip()
+        quoted = Lexer._quoted(key) if key else None
+        if quoted is not None:
+            key = quoted
+        value = value.strip()
+        return key.strip(), child if self._is_child(value, text, end, child_end) else value
+
+    def _is_child(self, item: str, text: str, end: int, child_end: int) -> bool:
+        # the item is exactly the scanned nested collection (and not the name of a section)
+        if child_end < 0 or (child_end != end and not text[child_end:end].isspace()):
+            return False
+        return not (self._bracketed and item in self._sections)
+
+    @staticmethod
+    def _quoted(value: str) -> Optional[str]:
+        # "'...'" or '"..."', the closing quote is the last one on the first line
+        q = value[0]
+        if q != "'" and q != '"':
+            return None
+        nl = value.find('\n')
+        j = value.rfind(q, 1, nl if nl >= 0 else len(value))
+        if j < 1:
+            return None
+        return unescape(value[1:j])
+
+    @staticmethod
+    def _prefixed(value: str, prefix: str) -> Optional[str]:
+        # 'pattern:<rest of the first line>'
+        if not value.startswith(prefix) or len(value) == len(prefix) or value[len(prefix)] == '\n':
+            return None
+        nl = value.find('\n', len(prefix))
+        return value[len(prefix):nl] if nl >= 0 else value[len(prefix):]
+
+
+def unescape(value: str) -> str:
+    # drops the (first) escaping backslash
+    i = value.find('\\')
+    if i < 0:
+        return value
+    return value[:i] + value[i + 1:]
@@ -0,0 +1,99 @@
+import configparser
+import locale
+import mmap
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# section headers start at column 0 (indented lines are continuations of values), see configparser.SECTCRE
+_HEADER_PATTERN = re.compile(rb'^\[(.+)\]', re.MULTILINE)
+
+
+class IndexedParser:
+    # read-only stand-in for configparser.ConfigParser over a memory-mapped file: one scan indexes the section
+    # headers (key -> byte range), the options of a section are parsed only when the section is accessed and not
+    # kept (the file must not be modified in place while in use, replace it instead)
+
+    def __init__(self, path: str, encoding: Optional[str] = None):
+        self._path = path
+        self._encoding = encoding or locale.getpreferredencoding(False)
+        self._map = None
+        self._index = {}
+        self._default = None
+        self._scan()
+
+    def sections(self) -> List[str]:
+        return list(self._index)
+
+    def has_section(self, key: str) -> bool:
+        return key in self._index
+
+    def items(self, key: str, raw: bool = False) -> List[Tuple[str, str]]:
+        return self._materialize(key).items(key, raw=raw)
+
+    def contains(self, text: str) -> bool:
+        # whether the text occurs anywhere in the file (a scan of the map, nothing is parsed)
+        return self._map is not None and self._map.find(text.encode(self._encoding)) >= 0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __contains__(self, key: str):
+        return key in self._index or key == configparser.DEFAULTSECT
+
+    def __iter__(self) -> Iterator[str]:
+        yield configparser.DEFAULTSECT
+        yield from self._index
+
+    def __getitem__(self, key: str) -> configparser.SectionProxy:
+        if key not in self._index:
+            raise KeyError(key)
+        return self._materialize(key)[key]
+
+    def __len__(self):
+        return len(self._index) + 1
+
+    # private
+
+    def _scan(self):
+        with open(self._path, 'rb') as f:
+            if f.seek(0, 2) == 0:
+                return  # empty file, can't be mapped
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        index = {}
+        start = None
+        key = None
+        for m in _HEADER_PATTERN.finditer(self._map):
+            if key is None:
+                if m.start() > 0:
+                    # options before the first header raise MissingSectionHeaderError
+                    configparser.ConfigParser().read_string(self._text(0, m.start()), self._path)
+            else:
+                self._add(index, key, start, m.start())
+            key = m.group(1).decode(self._encoding)
+            start = m.start()
+        if key is not None:
+            self._add(index, key, start, len(self._map))
+        else:
+            configparser.ConfigParser().read_string(self._text(0, len(self._map)), self._path)
+        self._index = index
+
+    def _add(self, index: Dict[str, Tuple[int, int]], key: str, start: int, end: int):
+        if key == configparser.DEFAULTSECT:
+            self._default = (start, end)
+        elif key in index:
+            raise configparser.DuplicateSectionError(key, self._path, self._map[:start].count(b'\n') + 1)
+        else:
+            index[key] = (start, end)
+
+    def _materialize(self, key: str) -> configparser.ConfigParser:
+        parser = configparser.ConfigParser()
+        if self._default is not None:
+            parser.read_string(self._text(*self._default), self._path)
+        parser.read_string(self._text(*self._index[key]), self._path)
+        return parser
+
+    def _text(self, start: int, end: int) -> str:
+        return self._map[start:end].decode(self._encoding)
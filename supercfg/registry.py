@@ -0,0 +1,136 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Callable, Tuple, Any
+
+from supercfg.stats import count
+
+DEFAULT_MAX_SIZE = 256
+
+
+class CfgRegistry:
+    # process-wide store of parsed cfg files: one instance per (absolute path, lazy, indexed), revalidated by a
+    # stat() of the file (and of the files it pulled in through @ references) and optionally bounded by LRU eviction;
+    # kept instances are handed out to all callers (Cfg makes their sections read-only)
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_size: Optional[int] = None):
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def default() -> 'CfgRegistry':
+        if CfgRegistry._default is None:
+            with CfgRegistry._default_lock:
+                if CfgRegistry._default is None:
+                    CfgRegistry._default = CfgRegistry(max_size=DEFAULT_MAX_SIZE)
+        return CfgRegistry._default
+
+    @property
+    def max_size(self) -> Optional[int]:
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, value: Optional[int]):
+        with self._lock:
+            self._max_size = value
+            self._evict()
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def get(self, path: str, lazy: bool, load: Callable[[], Any], share: Optional[Callable[[Any], bool]] = None,
+            indexed: bool = False):
+        # share: called before a loaded instance is kept to be handed out again, returns False to not keep it (then
+        # every call loads a fresh one); not called when nothing is kept (max_size=0)
+        key = (os.path.abspath(path), lazy, indexed)
+        stamp = CfgRegistry._stamp(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp and CfgRegistry._current(entry[1]):
+                self._entries.move_to_end(key)
+                self._hits += 1
+                count('registry_hits')
+                return entry[1]
+            self._misses += 1
+        count('registry_misses')
+
+        # load outside of the lock: loading may recurse into the registry, concurrent loads of one file are harmless
+        cfg = load()
+        if not self._keeps(cfg, share):
+            return cfg
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp and CfgRegistry._current(entry[1]):
+                return entry[1]  # another thread was faster, hand out a single instance
+            self._entries[key] = (stamp, cfg)
+            self._entries.move_to_end(key)
+            self._evict()
+        return cfg
+
+    def put(self, path: str, lazy: bool, cfg, indexed: bool = False, share: Optional[Callable[[Any], bool]] = None):
+        if not self._keeps(cfg, share):
+            return
+        key = (os.path.abspath(path), lazy, indexed)
+        stamp = CfgRegistry._stamp(path)
+        with self._lock:
+            self._entries[key] = (stamp, cfg)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def invalidate(self, path: str):
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path: str):
+        path = os.path.abspath(path)
+        return any(key[0] == path for key in list(self._entries))
+
+    # private
+
+    def _keeps(self, cfg, share: Optional[Callable[[Any], bool]]) -> bool:
+        if self._max_size == 0:
+            return False
+        return share is None or share(cfg)
+
+    def _evict(self):
+        if self._max_size is None:
+            return
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _current(cfg) -> bool:
+        # the files the cfg pulled in through @ references are unchanged too
+        for file, stamp in cfg.stamps.items():
+            try:
+                if CfgRegistry._stamp(file) != stamp:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    @staticmethod
+    def _stamp(path: str) -> Tuple[int, int]:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
@@ -0,0 +1,165 @@
+import keyword
+from typing import Any, Dict, Optional, Union, get_args, get_origin
+
+from supercfg.symbols import LazySymbol
+
+_NONE_TYPE = type(None)
+
+
+class TypedSection:
+    # base of the classes generated by Schema: plain slots, validated when loaded, no checks on access
+
+    __slots__ = ('clazz', 'name')
+
+    @property
+    def identifier(self) -> str:
+        return '{}::{}'.format(self.clazz, self.name)
+
+    @property
+    def to_dict(self):
+        build = {'name': self.name, 'clazz': self.clazz}
+        for field in type(self).__annotations__:
+            value = getattr(self, field)
+            build[field] = value.to_dict if isinstance(value, TypedSection) else value
+        return build
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in ('clazz', 'name') + self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(field, getattr(self, field)) for field in ('clazz', 'name') + self.__slots__))
+
+
+class Schema:
+    # field types of the sections of a clazz, e.g. Schema('tokenizer', {'vocab_size': Optional[int], 'factory': type})
+    # types: classes, typing's Any/Optional/Union/List/Dict (only the container class is checked) or a Schema for
+    # nested sections; Optional fields may be missing (None), fields which aren't declared are ignored
+
+    def __init__(self, clazz: str, fields: Dict[str, Any], name: Optional[str] = None):
+        for field in fields:
+            if not field.isidentifier() or keyword.iskeyword(field) or field in TypedSection.__slots__:
+                raise Exception('illegal field name: {}, in schema: {}'.format(field, clazz))
+        self._clazz = clazz
+        self._fields = dict(fields)
+        self._type = type(name or Schema._class_name(clazz), (TypedSection,), {
+            '__slots__': tuple(self._fields),
+            '__annotations__': dict(self._fields),
+            '__module__': __name__,
+        })
+
+    @property
+    def clazz(self) -> str:
+        return self._clazz
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        return dict(self._fields)
+
+    @property
+    def type(self) -> type:
+        return self._type
+
+    @staticmethod
+    def infer(cfg, clazz: str, name: Optional[str] = None) -> 'Schema':
+        # types seen in the sections of the clazz: fields missing in some sections (or None) are Optional,
+        # int & float is float, other mixes are Unions
+        sections = [sect for sect in cfg.sections.values() if sect.clazz == clazz]
+        if not sections:
+            raise Exception('no sections of clazz: {}, in: {}'.format(clazz, cfg.path))
+        seen = {}
+        for sect in sections:
+            for field, value in sect.all_fields.items():
+                types = seen.setdefault(field, [])
+                kind = Any if isinstance(value, LazySymbol) else type(value)
+                if kind not in types:
+                    types.append(kind)
+        counts = {field: sum(1 for sect in sections if field in sect.all_fields) for field in seen}
+
+        fields = {}
+        for field, types in seen.items():
+            optional = _NONE_TYPE in types or counts[field] < len(sections)
+            types = [kind for kind in types if kind is not _NONE_TYPE]
+            if int in types and float in types:
+                types.remove(int)
+            if not types or Any in types:
+                fields[field] = Any
+                continue
+            expected = types[0] if len(types) == 1 else Union[tuple(types)]
+            fields[field] = Optional[expected] if optional else expected
+        return Schema(clazz, fields, name)
+
+    def load(self, sect, memo: Optional[Dict[int, TypedSection]] = None) -> TypedSection:
+        # validated instance of the generated class
+        if memo is None:
+            memo = {}
+        loaded = memo.get(id(sect))
+        if loaded is not None:
+            return loaded
+        if sect.clazz != self._clazz:
+            raise Exception('wrong clazz: {}, expected: {}'.format(sect.identifier, self._clazz))
+
+        loaded = self._type.__new__(self._type)
+        memo[id(sect)] = loaded
+        loaded.clazz = sect.clazz
+        loaded.name = sect.name
+        fields = sect.all_fields
+        for field, expected in self._fields.items():
+            value = fields.get(field)
+            if isinstance(value, LazySymbol) and expected is not Any:
+                value = value.__wrapped__
+            if isinstance(expected, Schema):
+                if not hasattr(value, 'all_fields'):
+                    raise Schema._error(sect, field, expected.type.__name__, value, fields)
+                value = expected.load(value, memo)
+            elif not Schema._check(expected, value):
+                raise Schema._error(sect, field, expected, value, fields)
+            elif type(value) is int and expected in (float, Optional[float]):
+                value = float(value)  # 1e3 is parsed as an int
+            setattr(loaded, field, value)
+        return loaded
+
+    def load_all(self, cfg) -> Dict[str, TypedSection]:
+        memo = {}
+        return {identifier: self.load(sect, memo) for identifier, sect in cfg.sections.items()
+                if sect.clazz == self._clazz}
+
+    def __repr__(self):
+        return 'Schema({!r}, {!r})'.format(self._clazz, self._fields)
+
+    # private
+
+    @staticmethod
+    def _check(expected: Any, value: Any) -> bool:
+        if expected is Any:
+            return True
+        origin = get_origin(expected)
+        if origin is Union:
+            return any(Schema._check(arg, value) for arg in get_args(expected))
+        if origin is not None:
+            expected = origin
+        if expected is _NONE_TYPE:
+            return value is None
+        if isinstance(value, bool) and expected in (int, float):
+            return False
+        if expected is float:
+            return isinstance(value, (int, float))
+        return isinstance(value, expected)
+
+    @staticmethod
+    def _error(sect, field: str, expected: Any, value: Any, fields: Dict[str, Any]) -> Exception:
+        if field not in fields:
+            return Exception('missing field: {}, in: {}'.format(field, sect.identifier))
+        return Exception('wrong type of field: {}, expected: {}, got: {!r}, in: {}'.format(
+            field, getattr(expected, '__name__', expected), value, sect.identifier))
+
+    @staticmethod
+    def _class_name(clazz: str) -> str:
+        # 'tokenized-ds' -> 'TokenizedDsSection'
+        parts = ''.join(c if c.isalnum() else ' ' for c in clazz).split()
+        name = ''.join(part[:1].upper() + part[1:] for part in parts) + 'Section'
+        return name if name.isidentifier() else '_' + name
@@ -0,0 +1,173 @@
+import importlib.util
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+from supercfg.stats import count
+
+_HEADER_PATTERN = re.compile(r'^\[(.+)\]', re.MULTILINE)
+
+# per process: path -> (exists, time of the stat)
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class Manifest:
+    # all the .cfg files under some dirs, listed once: file name (relative to its dir, without '.cfg') -> path and
+    # section identifier -> path of the file defining it (the first dir wins)
+
+    def __init__(self, files: Dict[str, str], sections: Dict[str, str]):
+        self._files = files
+        self._sections = sections
+
+    @property
+    def files(self) -> Dict[str, str]:
+        return self._files
+
+    @property
+    def sections(self) -> Dict[str, str]:
+        return self._sections
+
+    @staticmethod
+    def build(dirs: List[str]) -> 'Manifest':
+        # section headers are found by a scan of the text (headers start at column 0), nothing is parsed
+        files = {}
+        sections = {}
+        for root in dirs:
+            for dir_path, dir_names, file_names in os.walk(root):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    if not file_name.endswith('.cfg'):
+                        continue
+                    path = os.path.join(dir_path, file_name)
+                    name = os.path.relpath(path, root)[:-len('.cfg')].replace(os.sep, '/')
+                    if name in files:
+                        continue
+                    files[name] = path
+                    with open(path, encoding='utf-8') as f:
+                        for key in _HEADER_PATTERN.findall(f.read()):
+                            sections.setdefault(key.split('(', 1)[0].strip(), path)
+        count('manifest_builds')
+        return Manifest(files, sections)
+
+    def save(self, path: str):
+        tmp = '{}.tmp'.format(path)
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'files': self._files, 'sections': self._sections}, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def load(path: str) -> 'Manifest':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return Manifest(data['files'], data['sections'])
+
+
+class SearchPath:
+    # where the file of a `clazz::name@file` reference is looked for: the dir of the referencing cfg first, then the
+    # dirs of the search path in order ('package:name' stands for the dirs of an importable package); whether a file
+    # exists is cached per process (for ttl seconds, or until invalidate()); with a manifest the files under the
+    # search path are listed once and finding one is a dict hit (manifest: True to build it on first use, or the
+    # path of a saved one)
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, dirs: Optional[List[str]] = None, ttl: Optional[float] = None,
+                 manifest: Union[bool, str] = False):
+        self._entries = list(dirs or [])
+        self._ttl = ttl
+        self._dirs = None
+        self._manifest = None
+        self._manifest_source = manifest
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default() -> 'SearchPath':
+        # the process-wide search path, initially the dirs in SUPERCFG_PATH (separated by os.pathsep)
+        if SearchPath._default is None:
+            with SearchPath._default_lock:
+                if SearchPath._default is None:
+                    entries = os.environ.get('SUPERCFG_PATH', '')
+                    SearchPath._default = SearchPath([entry for entry in entries.split(os.pathsep) if entry])
+        return SearchPath._default
+
+    @staticmethod
+    def set_default(search: Optional['SearchPath']):
+        # None: back to SUPERCFG_PATH
+        with SearchPath._default_lock:
+            SearchPath._default = search
+
+    @staticmethod
+    def invalidate(path: Optional[str] = None):
+        # forgets cached existence checks (of a path, or all of them)
+        with _stats_lock:
+            if path is None:
+                _stats.clear()
+            else:
+                _stats.pop(path, None)
+
+    @property
+    def dirs(self) -> List[str]:
+        if self._dirs is None:
+            build = []
+            for entry in self._entries:
+                build.extend(SearchPath._expand(entry))
+            self._dirs = build
+        return self._dirs
+
+    @property
+    def manifest(self) -> Manifest:
+        if self._manifest is None:
+            with self._lock:
+                if self._manifest is None:
+                    if isinstance(self._manifest_source, str) and os.path.exists(self._manifest_source):
+                        self._manifest = Manifest.load(self._manifest_source)
+                    else:
+                        self._manifest = Manifest.build(self.dirs)
+        return self._manifest
+
+    def find(self, name: str, origin_dir: str) -> Optional[str]:
+        # path of the file `name` refers to from a cfg in origin_dir, None if there's no such file
+        file = '{}.cfg'.format(os.path.join(origin_dir, name))
+        if self.exists(file):
+            return file
+        if self._manifest_source:
+            count('manifest_lookups')
+            return self.manifest.files.get(name)
+        for dir_path in self.dirs:
+            file = '{}.cfg'.format(os.path.join(dir_path, name))
+            if self.exists(file):
+                return file
+        return None
+
+    def locate(self, identifier: str) -> Optional[str]:
+        # path of the file (under the search path) defining the section, builds the manifest if needed
+        return self.manifest.sections.get(identifier)
+
+    def exists(self, path: str) -> bool:
+        entry = _stats.get(path)
+        if entry is not None and (self._ttl is None or time.monotonic() - entry[1] < self._ttl):
+            return entry[0]
+        count('stat_probes')
+        exists = os.path.isfile(path)
+        with _stats_lock:
+            _stats[path] = (exists, time.monotonic())
+        return exists
+
+    def __repr__(self):
+        return 'SearchPath({!r})'.format(self._entries)
+
+    # private
+
+    @staticmethod
+    def _expand(entry: str) -> List[str]:
+        if not entry.startswith('package:'):
+            return [entry]
+        spec = importlib.util.find_spec(entry[len('package:'):])
+        if spec is None or not spec.submodule_search_locations:
+            raise Exception('no such package: {}'.format(entry))
+        return list(spec.submodule_search_locations)
@@ -0,0 +1,406 @@
+import pickle
+import struct
+from multiprocessing import shared_memory
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from supercfg.frozen import FrozenCfg, FrozenSection
+
+# flat little-endian layout of a frozen cfg:
+#   header   magic, version, number of sections, number of cfg sections, path, section table, cfg section index
+#   values   tag byte + payload, containers hold offsets of their (earlier written) elements
+#   sections clazz, name, number of fields, (field name, value) offsets - flattened, all_fields order
+#   table    offsets of all sections: the cfg's own ones in file order, then ones reachable from other files
+#   index    (identifier, section number) of the cfg's own sections, sorted by identifier
+
+_MAGIC = b'SCFG'
+_VERSION = 1
+_HEADER = struct.Struct('<4sIIIQQQ')
+_SECTION = struct.Struct('<QQI')
+_PAIR = struct.Struct('<QQ')
+_OFFSET = struct.Struct('<Q')
+_COUNT = struct.Struct('<I')
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+
+_NONE = b'N'
+_TRUE = b'T'
+_FALSE = b'F'
+_INT_TAG = b'I'
+_FLOAT_TAG = b'D'
+_STR = b'S'
+_TUPLE = b'L'
+_MAPPING = b'M'
+_SECTION_TAG = b'X'
+_PICKLED = b'P'  # anything else: compiled patterns, enums, big ints ...
+
+
+class SharedCfg:
+    # read-only view of a frozen cfg serialized into a multiprocessing.shared_memory block (see Cfg.share()):
+    # workers attach by name (or receive it pickled, which pickles just the name) and decode only what they read
+
+    __slots__ = ('_shm', '_buf', '_owner', '_path', '_sections', '_table', '_index', '_size')
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._buf = shm.buf
+        self._owner = owner
+        magic, version, sections, size, path, table, index = _HEADER.unpack_from(self._buf, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise Exception('not a shared cfg: {}'.format(shm.name))
+        self._sections = sections
+        self._size = size
+        self._path = path
+        self._table = table
+        self._index = index
+
+    @staticmethod
+    def create(frozen: FrozenCfg, name: Optional[str] = None) -> 'SharedCfg':
+        data = _Writer().write(frozen)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+        shm.buf[:len(data)] = data
+        return SharedCfg(shm, owner=True)
+
+    @staticmethod
+    def attach(name: str) -> 'SharedCfg':
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # the owner unlinks it (python 3.13+)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        return SharedCfg(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def path(self) -> str:
+        return self._decode(self._path)
+
+    @property
+    def size(self) -> int:
+        return self._shm.size
+
+    @property
+    def sections(self) -> Dict[str, 'SharedSection']:
+        build = {}
+        for number in range(self._size):
+            sect = SharedSection(self, number)
+            build[sect.identifier] = sect
+        return build
+
+    def options(self, section: str) -> 'SharedSection':
+        return self[section]
+
+    def accessor(self, path: str) -> Callable[[], Any]:
+        # the value never changes
+        value = self[path]
+        return lambda: value
+
+    def close(self):
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self):
+        # frees the block (owner), attached views stay readable until closed
+        self._shm.unlink()
+
+    def __getitem__(self, item):
+        path = item.split('/')
+        number = self._find(path[0])
+        if number is None:
+            raise Exception('no such section: {}'.format(path[0]))
+        value = SharedSection(self, number)
+        for i in range(1, len(path)):
+            section = value
+            value = section._field(path[i])
+            if value is None:
+                raise Exception('no such option: {}, in: {}'.format(path[i], section))
+            if not isinstance(value, SharedSection) and i + 1 < len(path):
+                raise Exception('illegal path: {}, in: {}'.format(path[i:], section))
+        return value
+
+    def __contains__(self, identifier: str):
+        return self._find(identifier) is not None
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return 'SharedCfg({!r}, name={!r})'.format(self.path, self.name)
+
+    def __reduce__(self):
+        return SharedCfg.attach, (self.name,)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    # private
+
+    def _find(self, identifier: str) -> Optional[int]:
+        # binary search in the sorted index
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key, number = _PAIR.unpack_from(self._buf, self._index + mid * _PAIR.size)
+            key = self._decode(key)
+            if key == identifier:
+                return number
+            if key < identifier:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _section_offset(self, number: int) -> int:
+        return _OFFSET.unpack_from(self._buf, self._table + number * _OFFSET.size)[0]
+
+    def _decode(self, offset: int) -> Any:
+        buf = self._buf
+        tag = buf[offset:offset + 1].tobytes()
+        offset += 1
+        if tag == _STR:
+            n = _COUNT.unpack_from(buf, offset)[0]
+            return str(buf[offset + 4:offset + 4 + n], 'utf-8')
+        if tag == _INT_TAG:
+            return _INT.unpack_from(buf, offset)[0]
+        if tag == _FLOAT_TAG:
+            return _FLOAT.unpack_from(buf, offset)[0]
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _SECTION_TAG:
+            return SharedSection(self, _COUNT.unpack_from(buf, offset)[0])
+        n = _COUNT.unpack_from(buf, offset)[0]
+        if tag == _TUPLE:
+            return tuple(self._decode(_OFFSET.unpack_from(buf, offset + 4 + i * _OFFSET.size)[0]) for i in range(n))
+        if tag == _MAPPING:
+            build = {}
+            for i in range(n):
+                key, value = _PAIR.unpack_from(buf, offset + 4 + i * _PAIR.size)
+                build[self._decode(key)] = self._decode(value)
+            return MappingProxyType(build)
+        if tag == _PICKLED:
+            return pickle.loads(buf[offset + 4:offset + 4 + n])
+        raise Exception('corrupted shared cfg: {}, at: {}'.format(self.name, offset - 1))
+
+
+class SharedSection:
+    # a section of a SharedCfg, fields are decoded on every access (keep the values you use in hot loops)
+
+    __slots__ = ('_cfg', '_number')
+
+    def __init__(self, cfg: SharedCfg, number: int):
+        object.__setattr__(self, '_cfg', cfg)
+        object.__setattr__(self, '_number', number)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        offset = self._field_offset(name)
+        if offset is None:
+            raise AttributeError(name)
+        return self._cfg._decode(offset)
+
+    def __setattr__(self, name, value):
+        raise Exception('assignment not supported, shared section: {}'.format(self.identifier))
+
+    def __setitem__(self, item, value):
+        raise Exception('assignment not supported, shared section: {}'.format(self.identifier))
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            if item == 0:
+                return 'clazz'
+            if item == 1:
+                return 'name'
+            return self._field_names()[item - 2]
+
+        value = self
+        for field in item.split('/'):
+            if not isinstance(value, SharedSection):
+                return None
+            value = value._field(field)
+        return value
+
+    def __len__(self):
+        return 2 + len(self._field_names())
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._cfg is other._cfg and self._number == other._number
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'SharedSection(clazz={!r}, name={!r})'.format(self.clazz, self.name)
+
+    @property
+    def clazz(self) -> str:
+        return self._cfg._decode(self._header()[0])
+
+    @property
+    def name(self) -> str:
+        return self._cfg._decode(self._header()[1])
+
+    @property
+    def identifier(self) -> str:
+        return '{}::{}'.format(self.clazz, self.name)
+
+    @property
+    def all_fields(self) -> Dict[str, Any]:
+        return {self._cfg._decode(key): self._cfg._decode(value) for key, value in self._pairs()}
+
+    @property
+    def to_dict(self):
+        # a mutable copy
+        build = {'name': self.name, 'clazz': self.clazz}
+        for k, v in self.all_fields.items():
+            build[k] = SharedSection._thaw(v)
+        return build
+
+    def get(self, key: str, default_value):
+        return self[key] if self[key] is not None else default_value
+
+    # private
+
+    def _header(self) -> Tuple[int, int, int]:
+        return _SECTION.unpack_from(self._cfg._buf, self._cfg._section_offset(self._number))
+
+    def _pairs(self) -> List[Tuple[int, int]]:
+        buf = self._cfg._buf
+        offset = self._cfg._section_offset(self._number)
+        n = _SECTION.unpack_from(buf, offset)[2]
+        offset += _SECTION.size
+        return [_PAIR.unpack_from(buf, offset + i * _PAIR.size) for i in range(n)]
+
+    def _field_names(self) -> List[str]:
+        return [self._cfg._decode(key) for key, _ in self._pairs()]
+
+    def _field_offset(self, field: str) -> Optional[int]:
+        for key, value in self._pairs():
+            if self._cfg._decode(key) == field:
+                return value
+        return None
+
+    def _field(self, field: str):
+        offset = self._field_offset(field)
+        if offset is not None:
+            return self._cfg._decode(offset)
+        if field == 'clazz':
+            return self.clazz
+        if field == 'name':
+            return self.name
+        return None
+
+    @staticmethod
+    def _thaw(value: Any) -> Any:
+        if isinstance(value, SharedSection):
+            return value.to_dict
+        if isinstance(value, tuple):
+            return [SharedSection._thaw(v) for v in value]
+        if isinstance(value, MappingProxyType):
+            return {k: SharedSection._thaw(v) for k, v in value.items()}
+        return value
+
+
+class _Writer:
+    # serializes a frozen cfg, equal strings and shared sections are written once
+
+    def __init__(self):
+        self._data = bytearray(_HEADER.size)
+        self._strings = {}
+        self._scalars = {}
+        self._numbers = {}  # id(frozen section) -> section number
+        self._pending = []
+
+    def write(self, frozen: FrozenCfg) -> bytearray:
+        # the cfg's own sections are numbered first, in file order
+        index = sorted((identifier, self._number(sect)) for identifier, sect in frozen.sections.items())
+        index = [(self._str(identifier), number) for identifier, number in index]
+        path = self._str(frozen.path)
+
+        offsets = []
+        while len(offsets) < len(self._pending):
+            offsets.append(self._section(self._pending[len(offsets)]))
+
+        table = self._append(b''.join(_OFFSET.pack(offset) for offset in offsets))
+        index_offset = self._append(b''.join(_PAIR.pack(key, number) for key, number in index))
+        _HEADER.pack_into(self._data, 0, _MAGIC, _VERSION, len(offsets), len(index), path, table, index_offset)
+        return self._data
+
+    # private
+
+    def _append(self, data: bytes) -> int:
+        offset = len(self._data)
+        self._data += data
+        return offset
+
+    def _number(self, sect: FrozenSection) -> int:
+        number = self._numbers.get(id(sect))
+        if number is None:
+            number = len(self._pending)
+            self._numbers[id(sect)] = number
+            self._pending.append(sect)
+        return number
+
+    def _section(self, sect: FrozenSection) -> int:
+        pairs = [_PAIR.pack(self._str(k), self._value(v)) for k, v in sect.all_fields.items()]
+        header = _SECTION.pack(self._str(sect.clazz), self._str(sect.name), len(pairs))
+        return self._append(header + b''.join(pairs))
+
+    def _str(self, value: str) -> int:
+        offset = self._strings.get(value)
+        if offset is None:
+            data = value.encode('utf-8')
+            offset = self._append(_STR + _COUNT.pack(len(data)) + data)
+            self._strings[value] = offset
+        return offset
+
+    def _value(self, value: Any) -> int:
+        # nested sections are written later (by number), so deep section graphs don't recurse
+        if type(value) is str:
+            return self._str(value)
+        if type(value) in (int, float, bool) or value is None:
+            # floats by their bits: -0.0 == 0.0 must not share a slot
+            key = (float, _FLOAT.pack(value)) if type(value) is float else (type(value), value)
+            offset = self._scalars.get(key)
+            if offset is None:
+                offset = self._scalar(value)
+                self._scalars[key] = offset
+            return offset
+        if isinstance(value, FrozenSection):
+            return self._append(_SECTION_TAG + _COUNT.pack(self._number(value)))
+        if type(value) is tuple:
+            items = [self._value(v) for v in value]
+            return self._append(_TUPLE + _COUNT.pack(len(items)) + b''.join(_OFFSET.pack(v) for v in items))
+        if type(value) is MappingProxyType:
+            items = [_PAIR.pack(self._value(k), self._value(v)) for k, v in value.items()]
+            return self._append(_MAPPING + _COUNT.pack(len(items)) + b''.join(items))
+        return self._pickled(value)
+
+    def _scalar(self, value: Any) -> int:
+        if value is None:
+            return self._append(_NONE)
+        if value is True:
+            return self._append(_TRUE)
+        if value is False:
+            return self._append(_FALSE)
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return self._append(_INT_TAG + _INT.pack(value))
+        if type(value) is float:
+            return self._append(_FLOAT_TAG + _FLOAT.pack(value))
+        return self._pickled(value)
+
+    def _pickled(self, value: Any) -> int:
+        data = pickle.dumps(value)
+        return self._append(_PICKLED + _COUNT.pack(len(data)) + data)
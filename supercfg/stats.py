@@ -0,0 +1,128 @@
+import threading
+import time
+from contextlib import nullcontext
+from typing import Optional, Callable, Dict, Any
+
+# opt-in, process-wide instrumentation of parsing/resolving;
+# disabled (the default) every probe is a single global lookup
+
+PHASES = ('read', 'cache', 'parse', 'resolve', 'templates', 'imports')
+
+_collector = None
+_NULL = nullcontext()
+_local = threading.local()
+
+
+class Stats:
+    def __init__(self, hook: Optional[Callable[[str, float], None]] = None):
+        self._hook = hook
+        self._lock = threading.Lock()
+        self._times = {}
+        self._counters = {}
+        self._resolves = {}
+
+    def add_time(self, phase: str, seconds: float):
+        with self._lock:
+            self._times[phase] = self._times.get(phase, 0.0) + seconds
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def count_resolve(self, file: Optional[str], identifier: str):
+        # per file: sections of different files may have the same identifier
+        with self._lock:
+            resolves = self._resolves.setdefault(file, {})
+            resolves[identifier] = resolves.get(identifier, 0) + 1
+            self._counters['resolve_calls'] = self._counters.get('resolve_calls', 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'phases': dict(self._times),
+                'counters': dict(self._counters),
+                'resolves': {file: dict(resolves) for file, resolves in self._resolves.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._times.clear()
+            self._counters.clear()
+            self._resolves.clear()
+
+
+class _Phase:
+    # times are exclusive: time spent in a nested phase (e.g. 'parse' of a lazily loaded section during 'resolve')
+    # is accounted to the nested phase only
+
+    __slots__ = ('_stats', '_name', '_start', '_nested')
+
+    def __init__(self, stats: Stats, name: str):
+        self._stats = stats
+        self._name = name
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self._nested = 0.0
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed = time.perf_counter() - self._start
+        stack = _local.stack
+        stack.pop()
+        self._stats.add_time(self._name, elapsed - self._nested)
+        if stack:
+            stack[-1]._nested += elapsed
+        elif self._stats._hook is not None:
+            self._stats._hook(self._name, elapsed)
+        return False
+
+
+def enable(hook: Optional[Callable[[str, float], None]] = None) -> Stats:
+    # hook(phase, seconds) is called whenever a top-level phase ends
+    global _collector
+    _collector = Stats(hook)
+    return _collector
+
+
+def disable():
+    global _collector
+    _collector = None
+
+
+def enabled() -> bool:
+    return _collector is not None
+
+
+def snapshot() -> Dict[str, Any]:
+    collector = _collector
+    return collector.snapshot() if collector is not None else {}
+
+
+def reset():
+    collector = _collector
+    if collector is not None:
+        collector.reset()
+
+
+# probes
+
+def phase(name: str):
+    collector = _collector
+    return _NULL if collector is None else _Phase(collector, name)
+
+
+def count(name: str, n: int = 1):
+    collector = _collector
+    if collector is not None:
+        collector.count(name, n)
+
+
+def count_resolve(file: Optional[str], identifier: str):
+    collector = _collector
+    if collector is not None:
+        collector.count_resolve(file, identifier)
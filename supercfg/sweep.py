@@ -0,0 +1,114 @@
+from typing import Any, Dict, List
+
+MODES = ('product', 'zip')
+_RESERVED = ('base', 'mode')
+
+
+class Sweep:
+    # variants of a section declared by a sweep section, e.g.
+    #
+    #   [sweep::adam-lr]
+    #   base = optimizer::adam
+    #   mode = product  ; or zip
+    #   lr = [1e-4, 3e-4, 1e-3]
+    #   betas = [[0.9, 0.98], [0.9, 0.999]]
+    #
+    # every other field of the sweep section lists the values of a field of the base section; variants are numbered
+    # like itertools.product over the fields in sorted order (the last field varies fastest) or zipped, so variant i
+    # is computed directly from i; a variant is the base section resolved in an overlay of the cfg (see
+    # Cfg.overlay), which shares everything the swept fields don't reach
+
+    def __init__(self, cfg, identifier: str):
+        if identifier not in cfg.headers:
+            raise Exception('no such section: {}'.format(identifier))
+        fields = cfg[identifier].all_fields
+        base = fields.get('base')
+        if not hasattr(base, 'identifier'):
+            raise Exception('sweep without a base section: {}'.format(identifier))
+        if base.identifier not in cfg.headers:
+            raise Exception('base of a sweep is not a section of the same cfg: {}, in: {}'.format(
+                base.identifier, identifier))
+        mode = fields.get('mode', 'product')
+        if mode not in MODES:
+            raise Exception('illegal sweep mode: {}, expected one of: {}, in: {}'.format(mode, MODES, identifier))
+
+        values = {}
+        for field in sorted(fields):
+            if field in _RESERVED:
+                continue
+            if not isinstance(fields[field], list):
+                raise Exception('values of a swept field are not a list: {}, in: {}'.format(field, identifier))
+            values[field] = fields[field]
+        if not values:
+            raise Exception('nothing to sweep: {}'.format(identifier))
+        sizes = [len(v) for v in values.values()]
+        if mode == 'zip' and len(set(sizes)) > 1:
+            raise Exception('zipped fields of unequal length: {}, in: {}'.format(dict(zip(values, sizes)), identifier))
+
+        self._cfg = cfg
+        self._identifier = identifier
+        self._base = base.identifier
+        self._mode = mode
+        self._values = values
+        self._sizes = sizes
+        if mode == 'zip':
+            self._length = sizes[0]
+        else:
+            self._length = 1
+            for size in sizes:
+                self._length *= size
+
+    @property
+    def identifier(self) -> str:
+        return self._identifier
+
+    @property
+    def base(self) -> str:
+        return self._base
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self._values)
+
+    def values(self, index: int) -> Dict[str, Any]:
+        # swept field -> its value in the variant
+        index = self._position(index)
+        if self._mode == 'zip':
+            return {field: values[index] for field, values in self._values.items()}
+        build = {}
+        for field, size in reversed(list(zip(self._values, self._sizes))):
+            index, digit = divmod(index, size)
+            build[field] = self._values[field][digit]
+        return {field: build[field] for field in self._values}
+
+    def overlay(self, index: int):
+        return self._cfg.overlay({'{}/{}'.format(self._base, field): value
+                                  for field, value in self.values(index).items()})
+
+    def __getitem__(self, index: int):
+        # the resolved base section of the variant
+        return self.overlay(index)[self._base]
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self[i]
+
+    def __repr__(self):
+        return 'Sweep({}, {} x {})'.format(self._identifier, self._mode, dict(zip(self._values, self._sizes)))
+
+    # private
+
+    def _position(self, index: int) -> int:
+        if not isinstance(index, int):
+            raise Exception('illegal variant index: {!r}'.format(index))
+        position = index + self._length if index < 0 else index
+        if not 0 <= position < self._length:
+            raise IndexError('variant index out of range: {}, of: {}'.format(index, self._length))
+        return position
@@ -0,0 +1,126 @@
+import builtins
+import importlib
+import os
+import threading
+from typing import Any
+
+from supercfg.stats import phase, count
+
+# enum:, class: and callable: values; imported symbols are cached per process by dotted path, with deferred imports
+# (SUPERCFG_DEFER_IMPORTS=1 or defer_imports()) values are LazySymbol proxies which import on first use
+
+KINDS = ('enum', 'class', 'callable')
+
+_cache = {}
+_lock = threading.Lock()
+_deferred = os.environ.get('SUPERCFG_DEFER_IMPORTS', '') not in ('', '0')
+_MISSING = object()
+
+
+class LazySymbol:
+    # stands in for an enum:/class:/callable: value, imports it on first use and delegates to it (attributes,
+    # calls, equality, hashing); `__wrapped__` is the imported value
+
+    __slots__ = ('kind', 'path', '_target')
+
+    def __init__(self, kind: str, path: str):
+        self.kind = kind
+        self.path = path
+        self._target = _MISSING
+
+    @property
+    def __wrapped__(self) -> Any:
+        if self._target is _MISSING:
+            self._target = load(self.kind, self.path)
+        return self._target
+
+    def __getattr__(self, name):
+        if name in LazySymbol.__slots__:
+            raise AttributeError(name)
+        return getattr(self.__wrapped__, name)
+
+    def __call__(self, *args, **kwargs):
+        return self.__wrapped__(*args, **kwargs)
+
+    def __eq__(self, other):
+        if isinstance(other, LazySymbol):
+            other = other.__wrapped__
+        return self.__wrapped__ == other
+
+    def __hash__(self):
+        return hash(self.__wrapped__)
+
+    def __str__(self):
+        return str(self.__wrapped__)
+
+    def __repr__(self):
+        return 'LazySymbol({}:{})'.format(self.kind, self.path)
+
+    def __reduce__(self):
+        return LazySymbol, (self.kind, self.path)
+
+
+def defer_imports(enabled: bool = True):
+    # applies to values parsed afterwards
+    global _deferred
+    _deferred = enabled
+
+
+def deferred() -> bool:
+    return _deferred
+
+
+def value(kind: str, path: str) -> Any:
+    # value of a 'kind:path' field (the lexer's hook)
+    return LazySymbol(kind, path) if _deferred else load(kind, path)
+
+
+def load(kind: str, path: str) -> Any:
+    if kind == 'enum':
+        # enum:package.module.Enum.VALUE
+        parts = path.rsplit('.', 1)
+        count('enum_imports')
+        return import_symbol(parts[0])(parts[1])
+
+    symbol = import_symbol(path)
+    if kind == 'class' and not isinstance(symbol, type):
+        raise Exception('not a class: {}'.format(path))
+    if kind == 'callable' and not callable(symbol):
+        raise Exception('not callable: {}'.format(path))
+    return symbol
+
+
+def import_symbol(path: str) -> Any:
+    # 'package.module.Class.attribute' -> the object, modules are imported as needed; cached by path
+    symbol = _cache.get(path, _MISSING)
+    if symbol is _MISSING:
+        with phase('imports'):
+            symbol = _import(path)
+        count('symbol_imports')
+        with _lock:
+            _cache[path] = symbol
+    return symbol
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+
+
+# private
+
+def _import(path: str) -> Any:
+    parts = path.split('.')
+    try:
+        symbol = importlib.import_module(parts[0])
+    except ModuleNotFoundError as e:
+        if e.name != parts[0] or not hasattr(builtins, parts[0]):
+            raise
+        symbol = getattr(builtins, parts[0])
+    for i in range(1, len(parts)):
+        try:
+            symbol = getattr(symbol, parts[i])
+        except AttributeError:
+            # a submodule which hasn't been imported yet
+            symbol = importlib.import_module('.'.join(parts[:i + 1]))
+    return symbol
@@ -0,0 +1,93 @@
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+_PATTERN = re.compile(r'\$\(([a-zA-Z0-9_]+)\)')
+_MISSING = object()
+
+_BUILTINS = {
+    'TIMESTAMP': lambda: time.strftime('%Y%m%d_%H%M%S'),
+    'UUID': lambda: str(uuid.uuid4()),
+}
+
+
+class Templates:
+    # $(NAME) variables of a cfg, evaluated once (on first use) and shared by all the values of the cfg: a name is
+    # looked up in the cfg's own variables, registered providers, built-ins (TIMESTAMP, UUID) and environment
+    # variables, in this order; unknown names are left as they are
+
+    _providers = {}
+    _providers_lock = threading.Lock()
+
+    def __init__(self, variables: Optional[Dict[str, Any]] = None):
+        self._variables = dict(variables or {})
+        self._values = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def register(name: str, provider: Callable[[], Any]):
+        # process-wide variable, e.g. Templates.register('HOST', socket.gethostname)
+        with Templates._providers_lock:
+            Templates._providers[name] = provider
+
+    @staticmethod
+    def unregister(name: str):
+        with Templates._providers_lock:
+            Templates._providers.pop(name, None)
+
+    def set(self, name: str, value: Any):
+        # variable of this cfg only (a value or a callable), applies to sections parsed afterwards
+        with self._lock:
+            self._variables[name] = value
+            self._values.pop(name, None)
+
+    def value(self, name: str) -> Optional[str]:
+        value = self._values.get(name, _MISSING)
+        if value is _MISSING:
+            with self._lock:
+                value = self._values.get(name, _MISSING)
+                if value is _MISSING:
+                    value = self._evaluate(name)
+                    self._values[name] = value
+        return value
+
+    def render(self, value: str) -> str:
+        if '$(' not in value:
+            return value
+        return _PATTERN.sub(self._replace, value)
+
+    def apply(self, value: Any) -> Any:
+        # renders a string or all the strings nested in lists/dicts (in place)
+        if isinstance(value, str):
+            return self.render(value)
+        pending = [value] if isinstance(value, (list, dict)) else []
+        while pending:
+            container = pending.pop()
+            for k, v in list(enumerate(container) if isinstance(container, list) else container.items()):
+                if isinstance(v, str):
+                    if '$(' in v:
+                        container[k] = self.render(v)
+                elif isinstance(v, (list, dict)):
+                    pending.append(v)
+        return value
+
+    # private
+
+    def _replace(self, match) -> str:
+        value = self.value(match[1])
+        return match[0] if value is None else value
+
+    def _evaluate(self, name: str) -> Optional[str]:
+        value = self._variables.get(name, _MISSING)
+        if value is _MISSING:
+            value = Templates._providers.get(name, _MISSING)
+        if value is _MISSING:
+            value = _BUILTINS.get(name, _MISSING)
+        if value is _MISSING:
+            return os.environ.get(name)
+        if callable(value):
+            value = value()
+        return None if value is None else str(value)
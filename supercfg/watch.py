@@ -0,0 +1,95 @@
+import os
+import threading
+from typing import Callable, List, Dict, Optional, Tuple
+
+from supercfg.cfg import Cfg
+
+
+class CfgWatcher:
+    # polls the cfg file and all files it pulled in through @ references (plain stat(), no extra dependencies) and
+    # reloads only what changed, see Cfg.reload(); subscribers get the identifiers of changed sections
+
+    def __init__(self, cfg: Cfg, interval: float = 1.0, on_error: Optional[Callable[[Exception], None]] = None):
+        self._cfg = cfg
+        self._interval = interval
+        self._on_error = on_error
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stamps = self._stat()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def cfg(self) -> Cfg:
+        return self._cfg
+
+    def subscribe(self, callback: Callable[[List[str]], None]) -> Callable[[List[str]], None]:
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[List[str]], None]):
+        self._subscribers.remove(callback)
+
+    def poll(self) -> List[str]:
+        # a missing file (e.g. replaced by rm & mv) is an error and isn't reloaded: its sections stay as they are and
+        # it's checked again on the next poll
+        with self._lock:
+            stamps = self._stat()
+            changed = [file for file in stamps.keys() | self._stamps.keys()
+                       if stamps.get(file) != self._stamps.get(file)]
+            if not changed:
+                return []
+            missing = [file for file in changed if file in stamps and stamps[file] is None]
+            present = [file for file in changed if file not in missing]
+            identifiers = self._cfg.reload(present) if present else []
+            stamps = self._stat()  # @ references may have changed
+            missing = sorted(file for file in missing if file in stamps and stamps[file] is None)
+            for file in missing:
+                stamps[file] = self._stamps.get(file)
+            self._stamps = stamps
+        if identifiers:
+            for callback in list(self._subscribers):
+                callback(identifiers)
+        if missing:
+            raise Exception('missing file: {}'.format(', '.join(missing)))
+        return identifiers
+
+    def start(self) -> 'CfgWatcher':
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='supercfg-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    # private
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self.poll()
+            except Exception as e:  # e.g. a half-written file, retried on the next poll
+                if self._on_error is not None:
+                    self._on_error(e)
+
+    def _stat(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        build = {}
+        for file in [self._cfg.path] + self._cfg.dependencies:
+            try:
+                st = os.stat(file)
+                build[os.path.abspath(file)] = st.st_mtime_ns, st.st_size
+            except OSError:
+                build[os.path.abspath(file)] = None
+        return build
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from supercfg import Cfg, CfgRegistry
+
+
+class TestCache(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.dir, 'cache')
+        shutil.copy('conf/test/something.cfg', self.dir)
+        shutil.copy('conf/test/templates.cfg', self.dir)
+        self.path = os.path.join(self.dir, 'something.cfg')
+        self.registry = CfgRegistry(max_size=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_warm_cache(self):
+        cold = Cfg.parse(self.path, cache_dir=self.cache_dir, registry=self.registry)
+        self.assertIsNotNone(cold.parser)
+        self.assertEqual('c', cold['A::conf'].field1[2])
+
+        warm = Cfg.parse(self.path, cache_dir=self.cache_dir, registry=self.registry)
+        self.assertIsNone(warm.parser)
+        self.assertEqual('c', warm['A::conf'].field1[2])
+        self.assertEqual(3e10, warm['Y::knock_knock'].derived1['b'])
+        self.assertEqual(False, warm['X::bla/field2'])
+
+    def test_dependency_invalidation(self):
+        Cfg.parse(self.path, cache_dir=self.cache_dir, registry=self.registry)
+
+        with open(os.path.join(self.dir, 'templates.cfg'), 'a') as f:
+            f.write('\n[C::common]\nfield1 = [x]\n')
+
+        cfg = Cfg.parse(self.path, cache_dir=self.cache_dir, registry=self.registry)
+        self.assertIsNotNone(cfg.parser)
+        self.assertEqual('c', cfg['A::conf'].field1[2])
+
+    def test_touched_file_stays_cached(self):
+        Cfg.parse(self.path, cache_dir=self.cache_dir, registry=self.registry)
+
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        self.assertIsNone(Cfg.parse(self.path, cache_dir=self.cache_dir, registry=self.registry).parser)
+
+    def test_templates_not_cached(self):
+        with open(self.path, 'a') as f:
+            f.write('\n[R::run]\nid = run-$(UUID)\n')
+
+        Cfg.parse(self.path, cache_dir=self.cache_dir, registry=self.registry)
+        cfg = Cfg.parse(self.path, cache_dir=self.cache_dir, registry=self.registry)
+        self.assertIsNotNone(cfg.parser)
+
+    def test_broken_section(self):
+        with open(self.path, 'a') as f:
+            f.write('\n[R::broken]\nx = R::none/x\n')
+
+        cfg = Cfg.parse(self.path, lazy=True, cache_dir=self.cache_dir, registry=self.registry)
+        self.assertEqual('c', cfg['A::conf'].field1[2])
+        self.assertRaises(Exception, lambda: cfg['R::broken'])
+        cfg = Cfg.parse(self.path, cache_dir=self.cache_dir, registry=self.registry)  # fails on first use only
+        self.assertRaises(Exception, lambda: cfg['R::broken'])
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_cached_dependency_of_dependency(self):
+        for name, text in (('a', '[x::a]\nv = y::b/v@b\n'), ('b', '[y::b]\nv = z::c/v@c\n'), ('c', '[z::c]\nv = 1\n')):
+            with open(os.path.join(self.dir, '{}.cfg'.format(name)), 'w') as f:
+                f.write(text)
+        path = os.path.join(self.dir, 'a.cfg')
+        Cfg.parse(os.path.join(self.dir, 'b.cfg'), cache_dir=self.cache_dir, registry=self.registry)
+        b = Cfg.parse(os.path.join(self.dir, 'b.cfg'), cache_dir=self.cache_dir, registry=CfgRegistry())
+        self.assertIsNone(b.parser)
+        a = Cfg.parse(path, cache_dir=self.cache_dir, registry=b._registry)
+        self.assertEqual(1, a['x::a'].v)
+        self.assertEqual([os.path.join(self.dir, 'b.cfg'), os.path.join(self.dir, 'c.cfg')], a.dependencies)
+
+        with open(os.path.join(self.dir, 'c.cfg'), 'w') as f:
+            f.write('[z::c]\nv = 2\n')
+        self.assertEqual(2, Cfg.parse(path, cache_dir=self.cache_dir, registry=CfgRegistry(max_size=0))['x::a'].v)
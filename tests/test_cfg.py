@@ -1,7 +1,11 @@
+import asyncio
+import os
+import shutil
+import tempfile
 from enum import Enum
 from unittest import TestCase
 
-from supercfg import Cfg
+from supercfg import Cfg, CfgRegistry, stats
 
 
 class Choices(str, Enum):
@@ -111,3 +115,344 @@ class TestCfg(TestCase):
         self.assertFalse(cfg.regex_pattern.match('-22_00x'))
 
         self.assertEqual(Choices.B, cfg.choice)
+
+    def test_lazy(self):
+        script = """
+            [a::base]
+            field1 = [1, 2, 3]
+
+            [a::1(base)]
+            ref = b::1/field1
+
+            [b::1]
+            field1 = 'b'
+
+            [c::broken]
+            choice = enum:no_such_module.Choices.B
+        """
+        cfg = Cfg.parse_string(script, lazy=True)
+
+        self.assertEqual([1, 2, 3], cfg['a::1'].field1)
+        self.assertEqual('b', cfg['a::1'].ref)
+        self.assertEqual('b', cfg['b::1/field1'])
+        self.assertRaises(ModuleNotFoundError, lambda: cfg['c::broken'])
+
+        self.assertRaises(ModuleNotFoundError, lambda: Cfg.parse_string(script)['a::1'])
+
+    def test_lazy_cross_file(self):
+        cfg = Cfg.parse('conf/test/something.cfg', lazy=True)
+
+        self.assertEqual('c', cfg['Q::waw'].derived1[2])
+        self.assertEqual(1, cfg['B::conf'].field1[0])
+
+    def test_deep_chains(self):
+        depth = 3000
+        script = '[c::0]\nvalue = 0\nbase = 1\n'
+        script += ''.join('[c::{}({})]\nvalue = {}\n'.format(i, i - 1, i) for i in range(1, depth))
+        script += '[r::0]\nvalue = 0\n'
+        script += ''.join('[r::{}]\nvalue = r::{}/value\n'.format(i, i - 1) for i in range(1, depth))
+
+        for lazy in (False, True):
+            cfg = Cfg.parse_string(script, lazy=lazy)
+            self.assertEqual(1, cfg['c::{}'.format(depth - 1)].base)
+            self.assertEqual(depth - 1, cfg['c::{}'.format(depth - 1)].value)
+            self.assertEqual(0, cfg['r::{}'.format(depth - 1)].value)
+
+    def test_child_field_in_parent(self):
+        script = """
+            [a::base]
+            x = a::child/y
+
+            [a::child(base)]
+            y = 1
+        """
+        self.assertEqual(1, Cfg.parse_string(script)['a::child'].x)
+
+    def test_cycles(self):
+        def error(script):
+            with self.assertRaises(Exception) as context:
+                Cfg.parse_string(script).sections
+            return str(context.exception)
+
+        self.assertEqual('reference cycle: a::1/x -> a::2/y -> a::1/x', error("""
+            [a::1]
+            x = a::2/y
+
+            [a::2]
+            y = a::1/x
+        """))
+        self.assertEqual('inheritance cycle: a::1 -> a::2 -> a::1', error("""
+            [a::1(2)]
+            x = 1
+
+            [a::2(1)]
+            y = 2
+        """))
+        self.assertEqual('reference cycle: a::1 -> a::1/x -> a::2 -> a::2/y -> a::1', error("""
+            [a::1]
+            x = a::2
+
+            [a::2]
+            y = [1, a::1]
+        """))
+        self.assertEqual('reference cycle: a::base -> a::base/x -> a::child -> a::base', error("""
+            [a::base]
+            x = a::child
+
+            [a::child(base)]
+            y = 1
+        """))
+
+    def test_path_index(self):
+        cfg = Cfg.parse('conf/test/something.cfg', registry=CfgRegistry(max_size=0))
+
+        self.assertLess(10, cfg.build_index())
+        self.assertEqual(3e10, cfg['Y::knock_knock/derived1']['b'])
+        self.assertIs(cfg['X::bla'], cfg['X::bla'])
+
+        cfg['X::bla']['field2'] = True
+        self.assertEqual(True, cfg['X::bla/field2'])
+        cfg['X::bla'].field2 = 'x'
+        self.assertEqual('x', cfg['X::bla/field2'])
+        self.assertEqual('x', cfg['X::bla']['field2'])
+
+    def test_accessor(self):
+        cfg = Cfg.parse_string("""
+            [a::1]
+            inner = b::1
+
+            [b::1]
+            value = 1
+        """)
+        read = cfg.accessor('a::1/inner/value')
+        self.assertEqual(1, read())
+        self.assertEqual(1, read())
+
+        cfg['a::1'].inner['value'] = 2
+        self.assertEqual(2, read())
+        self.assertRaises(Exception, cfg.accessor('a::1/missing'))
+
+    def test_layered_inheritance(self):
+        cfg = Cfg.parse_string("""
+            [a::base]
+            field1 = [1, 2]
+            field2 = {x => 1}
+            field3 = 'base'
+
+            [a::1(base)]
+            field2 = {y => 2}
+            field3 = '1'
+        """)
+        base = cfg['a::base']
+        sect = cfg['a::1']
+
+        self.assertEqual({'field2', 'field3'}, set(sect.fields))
+        self.assertIs(base.field1, sect.field1)
+        self.assertEqual({'x': 1, 'y': 2}, sect.field2)
+        self.assertEqual(['field1', 'field2', 'field3'], list(sect.all_fields))
+        self.assertFalse(hasattr(sect, '__dict__'))
+        self.assertRaises(AttributeError, lambda: sect.field4)
+
+        base['field1'] = [3]
+        self.assertEqual([3], sect.field1)
+        sect.field1 = [4]
+        self.assertEqual([3], base.field1)
+        self.assertEqual([4], sect['field1'])
+
+    def test_interned_sections(self):
+        stats.enable()
+        try:
+            cfg = Cfg.parse_string("""
+                [a::1]
+                x = 'shared value'
+
+                [b::1]
+                build = [a::1, a::1]
+                ref = a::1
+                y = 'shared value'
+
+                [b::2]
+                build = [a::1]
+            """)
+            b1 = cfg['b::1']
+            self.assertIs(b1.build[0], b1.build[1])
+            self.assertIs(cfg['a::1'], b1.ref)
+            self.assertIs(cfg['a::1'], cfg['b::2'].build[0])
+            self.assertIs(cfg['a::1'].x, b1.y)
+            self.assertEqual(3, Cfg.stats()['counters']['sections_parsed'])
+        finally:
+            stats.disable()
+
+    def test_failed_resolution(self):
+        cfg = Cfg.parse_string("""
+            [a::1]
+            x = a::2/y
+
+            [a::2]
+            y = a::1/x
+        """, lazy=True)
+        for _ in range(2):
+            with self.assertRaises(Exception) as context:
+                cfg['a::2']
+            self.assertEqual('reference cycle: a::2/y -> a::1/x -> a::2/y', str(context.exception))
+
+    def test_missing_sections(self):
+        cfg = Cfg.parse_string("""
+            [a::1]
+            x = a::nope
+
+            [a::4(nope)]
+            y = 1
+        """, lazy=True)
+        for identifier, message in (('a::1', 'no such section: a::nope'),
+                                    ('a::4', 'no such section: a::nope, superclass of: a::4')):
+            with self.assertRaises(Exception) as context:
+                cfg[identifier]
+            self.assertIs(Exception, type(context.exception))
+            self.assertEqual(message, str(context.exception))
+
+    def test_parse_tree(self):
+        root = tempfile.mkdtemp()
+        outside = tempfile.mkdtemp()  # referenced, but not under the root
+        try:
+            os.makedirs(os.path.join(root, 'lib'))
+            files = {
+                os.path.join(root, 'a.cfg'): '[a::1(base@lib/base)]\nb = b::1@b\nsize = b::1/size@b\n',
+                os.path.join(root, 'b.cfg'): '[b::1]\nsize = 3\nshared = s::1@{}\n'.format(
+                    os.path.relpath(os.path.join(outside, 'shared'), root)),
+                os.path.join(root, 'lib', 'base.cfg'): '[a::base]\nkind = base\n',
+                os.path.join(outside, 'shared.cfg'): '[s::1]\nvalue = 1\n',
+            }
+            for file, content in files.items():
+                with open(file, 'w') as f:
+                    f.write(content)
+
+            for workers, lazy in ((1, False), (4, False), (4, True)):
+                tree = Cfg.parse_tree(root, workers=workers, lazy=lazy, registry=CfgRegistry(max_size=0))
+                self.assertEqual(list(files)[:3], list(tree))
+                a, b = tree[os.path.join(root, 'a.cfg')], tree[os.path.join(root, 'b.cfg')]
+                self.assertIs(b['b::1'], a['a::1'].b)
+                self.assertEqual(3, a['a::1/size'])
+                self.assertEqual('base', a['a::1'].kind)
+                self.assertEqual(1, b['b::1'].shared.value)
+        finally:
+            shutil.rmtree(root)
+            shutil.rmtree(outside)
+
+    def test_aparse(self):
+        root = tempfile.mkdtemp()
+        try:
+            for name, content in (('a', '[a::1]\nb = b::1@b\nc = c::1@c\n'), ('b', '[b::1]\nc = c::1@c\n'),
+                                  ('c', '[c::1]\nvalue = 1\n')):
+                with open(os.path.join(root, name + '.cfg'), 'w') as f:
+                    f.write(content)
+            registry = CfgRegistry(max_size=0)
+
+            async def load():
+                cfgs = await asyncio.gather(*[Cfg.aparse(os.path.join(root, 'a.cfg'), registry=registry)
+                                              for _ in range(5)])
+                other = await cfgs[0].aparse_other_cfg('c')
+                missing = await cfgs[0].aparse_other_cfg('d')
+                return cfgs, other, missing
+
+            cfgs, other, missing = asyncio.run(load())
+            self.assertEqual(3, registry.misses)  # concurrent loads were coalesced
+            self.assertTrue(all(cfg is cfgs[0] for cfg in cfgs))
+            self.assertIs(other['c::1'], cfgs[0]['a::1'].c)
+            self.assertIs(cfgs[0]['a::1'].c, cfgs[0]['a::1'].b.c)
+            self.assertIsNone(missing)
+            self.assertRaises(Exception, lambda: asyncio.run(Cfg.aparse(os.path.join(root, 'd.cfg'))))
+        finally:
+            shutil.rmtree(root)
+
+    def test_select(self):
+        script = """
+            [tokenizer::roberta]
+            vocab_size = None
+
+            [tokenizer::roberta-32000(roberta)]
+            vocab_size = 32000
+
+            [ds::delo_roberta]
+            tokenizer = tokenizer::roberta-32000
+
+            [tokenizer::bpe]
+            vocab_size = 1000
+
+            [tokenizer::roberta-16384(roberta)]
+            vocab_size = 16384
+
+            [ds::delo_roberta-part(delo_roberta)]
+            broken = enum:no_such_module.Choices.B
+        """
+        for lazy in (True, False):
+            cfg = Cfg.parse_string(script, lazy=lazy)
+            self.assertEqual(['tokenizer::roberta', 'tokenizer::roberta-32000', 'tokenizer::bpe',
+                              'tokenizer::roberta-16384'], cfg.match('tokenizer::*'))
+            self.assertEqual(['tokenizer::roberta-32000', 'tokenizer::roberta-16384'],
+                             cfg.match('tokenizer::roberta-*'))
+            self.assertEqual(['tokenizer::roberta', 'ds::delo_roberta'], cfg.match('*::*roberta'))
+            self.assertEqual(['tokenizer::bpe'], cfg.match('tokenizer::bpe'))
+            self.assertEqual([], cfg.match('none::*'))
+            self.assertRaises(Exception, lambda: cfg.match('tokenizer'))
+
+            stats.enable()
+            try:
+                selected = cfg.select('tokenizer::roberta-*')
+                self.assertEqual(32000, next(selected).vocab_size)
+                self.assertEqual(2, stats.snapshot()['counters']['sections_parsed'])
+                self.assertEqual([16384], [sect.vocab_size for sect in selected])
+                self.assertEqual(['delo_roberta'], [sect.name for sect in cfg.select('ds::delo_roberta')])
+            finally:
+                stats.disable()
+            self.assertIs(next(cfg.select('tokenizer::roberta-32000')),
+                          next(cfg.select('ds::delo_roberta')).tokenizer)
+
+        cfg = Cfg.parse('conf/test/something.cfg', registry=CfgRegistry(max_size=0))
+        self.assertEqual(['common'], [sect.name for sect in cfg.select('A::*@templates')])
+
+    def test_overlay(self):
+        cfg = Cfg.parse_string("""
+            [tokenizer::roberta]
+            vocab_size = 32000
+            options = {lower => true}
+
+            [tokenizer::roberta-16384(roberta)]
+            vocab_size = 16384
+
+            [ds::delo_roberta]
+            tokenizer = tokenizer::roberta
+            vocab_size = tokenizer::roberta/vocab_size
+
+            [fs::local]
+            root = /data
+        """)
+
+        stats.enable()
+        try:
+            overlay = cfg.overlay({'tokenizer::roberta/vocab_size': 50000})
+            self.assertEqual(0, stats.snapshot()['counters'].get('sections_parsed', 0))
+        finally:
+            stats.disable()
+        self.assertIs(cfg, overlay.base)
+        self.assertEqual(50000, overlay['ds::delo_roberta/vocab_size'])
+        self.assertEqual(50000, overlay['ds::delo_roberta'].tokenizer.vocab_size)
+        self.assertEqual({'lower': True}, overlay['tokenizer::roberta-16384/options'])
+        self.assertEqual(16384, overlay['tokenizer::roberta-16384/vocab_size'])
+        self.assertIs(cfg['fs::local'], overlay['fs::local'])
+        self.assertIsNot(cfg['ds::delo_roberta'], overlay['ds::delo_roberta'])
+        self.assertEqual(32000, cfg['ds::delo_roberta/vocab_size'])
+        self.assertEqual(list(cfg.sections), list(overlay.sections))
+
+        nested = overlay.overlay({'tokenizer::roberta/options': '{lower => false}',
+                                  'fs::local/root': 'tokenizer::roberta-16384'}, raw=True)
+        self.assertEqual(50000, nested['ds::delo_roberta/vocab_size'])
+        self.assertEqual({'lower': False}, nested['tokenizer::roberta-16384/options'])
+        self.assertIs(nested['tokenizer::roberta-16384'], nested['fs::local'].root)
+        self.assertEqual('/data', cfg['fs::local/root'])
+        self.assertEqual({'lower': True}, overlay['tokenizer::roberta/options'])
+
+        self.assertRaises(Exception, lambda: cfg.overlay({'tokenizer::roberta': 1}))
+        self.assertRaises(Exception, lambda: cfg.overlay({'tokenizer::none/vocab_size': 1}))
+        self.assertRaises(Exception, lambda: cfg.overlay({'fs::local/root': 1}, raw=True))
+        self.assertRaises(Exception, lambda: overlay.reload())
@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from unittest import TestCase
+
+from supercfg.cli import check, main
+
+
+class TestCli(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        shutil.copy('conf/test/something.cfg', self.dir)
+        shutil.copy('conf/test/templates.cfg', self.dir)
+        os.makedirs(os.path.join(self.dir, 'broken'))
+        self._write('broken/refs.cfg', """
+            [a::ok]
+            x = 1
+
+            [a::other-file]
+            x = b::1@none
+
+            [a::missing]
+            x = a::none/x
+
+            [a::cycle-1]
+            x = a::cycle-2/x
+
+            [a::cycle-2]
+            x = a::cycle-1/x
+        """)
+        self._write('broken/duplicate.cfg', '[a::1]\nx = 1\n[a::1]\nx = 2\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, name, text):
+        with open(os.path.join(self.dir, name), 'w') as f:
+            f.write('\n'.join(line.strip() for line in text.strip().splitlines()) + '\n')
+
+    def test_check(self):
+        for workers in (1, 2):
+            reports = {os.path.relpath(report['file'], self.dir): report for report in check(self.dir, workers)}
+            self.assertEqual(['broken/duplicate.cfg', 'broken/refs.cfg', 'something.cfg', 'templates.cfg'],
+                             sorted(reports))
+            self.assertEqual([], reports['something.cfg']['errors'])
+            self.assertEqual(6, reports['something.cfg']['sections'])
+
+            errors = reports['broken/refs.cfg']['errors']
+            self.assertEqual(['a::other-file', 'a::missing', 'a::cycle-1', 'a::cycle-2'],
+                             [error['section'] for error in errors])
+            self.assertIn('no such cfg: none.cfg', errors[0]['error'])
+            self.assertIn('no such section: a::none', errors[1]['error'])
+            self.assertIn('reference cycle', errors[2]['error'])
+
+            errors = reports['broken/duplicate.cfg']['errors']
+            self.assertEqual([None], [error['section'] for error in errors])
+            self.assertIn('DuplicateSectionError', errors[0]['error'])
+
+    def test_main(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(1, main(['check', self.dir, '--workers', '1']))
+        self.assertIn('  a::missing: no such section: a::none', out.getvalue())
+        self.assertIn('4 files, 13 sections, 5 errors', out.getvalue())
+
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(0, main(['check', 'conf/test', '--json']))
+        self.assertEqual(0, json.loads(out.getvalue())['errors'])
@@ -0,0 +1,95 @@
+import operator
+import threading
+from types import MappingProxyType
+from unittest import TestCase
+
+from supercfg import Cfg, CfgRegistry, FrozenCfg, FrozenSection
+
+
+class TestFrozen(TestCase):
+
+    def setUp(self):
+        self.cfg = Cfg.parse('conf/test/something.cfg', registry=CfgRegistry(max_size=0))
+
+    def test_snapshot(self):
+        frozen = self.cfg.freeze()
+
+        self.assertIsInstance(frozen, FrozenCfg)
+        self.assertIsInstance(frozen['A::conf'], FrozenSection)
+        self.assertEqual(('a', 'b', 'c'), frozen['A::conf'].field1)
+        self.assertEqual('c', frozen['A::conf/field1'][2])
+        self.assertEqual(3e10, frozen['Y::knock_knock'].derived1['b'])
+        self.assertIsInstance(frozen['X::bla'].field1, MappingProxyType)
+        self.assertEqual(False, frozen['X::bla/field2'])
+        self.assertEqual(self.cfg['Q::waw'].to_dict, frozen['Q::waw'].to_dict)
+        self.assertEqual(set(self.cfg.sections), set(frozen.sections))
+
+    def test_immutable(self):
+        frozen = self.cfg.freeze()
+        sect = frozen['X::bla']
+
+        self.assertRaises(Exception, lambda: setattr(sect, 'field2', True))
+        self.assertRaises(Exception, lambda: sect.__setitem__('field2', True))
+        self.assertRaises(TypeError, lambda: operator.setitem(sect.field1, 'b', 1))
+        self.assertRaises(Exception, lambda: setattr(frozen, 'path', None))
+        self.assertFalse(hasattr(sect, '__dict__'))
+
+    def test_shared_until_changed(self):
+        frozen = self.cfg.freeze()
+        self.assertIs(frozen, self.cfg.freeze())
+
+        self.cfg['X::bla']['field2'] = True
+        changed = self.cfg.freeze()
+        self.assertIsNot(frozen, changed)
+        self.assertEqual(False, frozen['X::bla/field2'])
+        self.assertEqual(True, changed['X::bla/field2'])
+
+    def test_shared_sections(self):
+        cfg = Cfg.parse_string("""
+            [a::1]
+            x = [1, 2]
+
+            [b::1]
+            build = [a::1, a::1]
+        """)
+        frozen = cfg.freeze()
+
+        self.assertIs(frozen['a::1'], frozen['b::1'].build[0])
+        self.assertIs(frozen['b::1'].build[0], frozen['b::1'].build[1])
+        self.assertEqual({'name': '1', 'clazz': 'b', 'build': [{'name': '1', 'clazz': 'a', 'x': [1, 2]}] * 2},
+                         frozen['b::1'].to_dict)
+
+    def test_deep_nesting(self):
+        depth = 3000
+        script = '[r::0]\nvalue = 0\n' + ''.join('[r::{}]\nvalue = r::{}\n'.format(i, i - 1) for i in range(1, depth))
+        frozen = Cfg.parse_string(script).freeze()
+
+        sect = frozen['r::{}'.format(depth - 1)]
+        for _ in range(depth - 1):
+            sect = sect.value
+        self.assertEqual(0, sect.value)
+
+    def test_concurrent_readers(self):
+        depth = 200
+        script = '[c::0]\nvalue = 0\n' + ''.join('[c::{}({})]\nref = c::{}/value\n'.format(i, i - 1, i - 1)
+                                                for i in range(1, depth))
+        cfg = Cfg.parse_string(script, lazy=True)
+        errors = []
+
+        def read(offset):
+            try:
+                for i in range(depth - 1, 0, -1):
+                    sect = cfg['c::{}'.format((i + offset) % (depth - 1) + 1)]
+                    if sect.ref != 0 or sect.value != 0:
+                        errors.append(sect.identifier)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=read, args=(i * 25,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+        self.assertEqual(0, cfg.freeze()['c::{}/ref'.format(depth - 1)])
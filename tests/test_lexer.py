@@ -0,0 +1,209 @@
+import random
+import re
+import warnings
+from enum import Enum
+from unittest import TestCase
+
+from supercfg.lexer import Lexer
+
+_NONE_PATTERN = re.compile(r'None|none|NONE')
+_INT_PATTERN = re.compile(r'^([+-]?[0-9_]+)$')
+_INT_EXP_PATTERN = re.compile(r'^([+-]?[0-9_]+e[+]?[0-9_]+)$')
+_FLOAT_PATTERN = re.compile(r'^([+-]?[0-9_]*\.[0-9_]*(e[+-]?[0-9_]+)?)$')
+_FLOAT_PATTERN_2 = re.compile(r'^([+-]?[0-9_]+e-[0-9_]+)$')
+_BOOL_PATTERN = re.compile(r'^(true|false)$')
+_QUOTED_PATTERN = re.compile(r"'(.*)'|\"(.*)\"")
+_RE_PATTERN = re.compile(r"pattern:(.+)")
+_ENUM_PATTERN = re.compile(r"enum:(.+)")
+
+
+class Color(Enum):
+    RED = 'RED'
+    GREEN = 'GREEN'
+
+
+class _Hooks:
+    sections = {'s::one': 1, 's::two(one)': 2, '[odd]': 3}
+
+    @staticmethod
+    def section(key):
+        return 'SECTION<{}>'.format(key)
+
+    @staticmethod
+    def reference(value):
+        parts = value.split('::')
+        if len(parts) == 1:
+            return None
+        if len(parts) != 2:
+            raise Exception('illegal key: {}'.format(value))
+        return 'REF<{}>'.format(value)
+
+    @staticmethod
+    def enum(value):
+        if not value.startswith('Color.'):
+            raise ModuleNotFoundError(value)
+        return Color[value.split('.', 1)[1]]
+
+
+class _Legacy:
+    # the regex cascade / split & re-parse value parser the lexer replaced, kept as the reference
+
+    @staticmethod
+    def parse_item(value):
+        if value in _Hooks.sections:
+            return _Hooks.section(value)
+
+        m = re.match(_QUOTED_PATTERN, value)
+        if m:
+            return _Legacy.unescape(m.group(1)) if m.group(1) is not None else _Legacy.unescape(m.group(2))
+        m = re.match(_RE_PATTERN, value)
+        if m:
+            return re.compile(m.group(1))
+        m = re.match(_ENUM_PATTERN, value)
+        if m:
+            return _Hooks.enum(m.group(1))
+        if re.match(_NONE_PATTERN, value):
+            return None
+        if re.match(_INT_PATTERN, value):
+            return int(value)
+        if re.match(_INT_EXP_PATTERN, value):
+            return int(float(value))
+        if re.match(_FLOAT_PATTERN, value):
+            return float(value)
+        if re.match(_FLOAT_PATTERN_2, value):
+            return float(value)
+        if re.match(_BOOL_PATTERN, value.lower()):
+            return value.lower() == 'true'
+        if value.startswith('[') and value.endswith(']'):
+            return [_Legacy.parse_item(item.strip()) for item in _Legacy.split_expression(value[1:-1])]
+        if value.startswith('{') and value.endswith('}'):
+            build = {}
+            for item in _Legacy.split_expression(value[1:-1]):
+                key, value = item.strip().split('=>', 1)
+                m = re.match(_QUOTED_PATTERN, key.strip())
+                if m:
+                    key = _Legacy.unescape(m.group(1)) if m.group(1) is not None else _Legacy.unescape(m.group(2))
+                build[key.strip()] = _Legacy.parse_item(value.strip())
+            return build
+        ref = _Hooks.reference(value)
+        if ref is not None:
+            return ref
+        return _Legacy.unescape(value).strip()
+
+    @staticmethod
+    def unescape(value):
+        build = ""
+        escaped = False
+        for char in value:
+            if char == '\\' and not escaped:
+                escaped = True
+                continue
+            build += char
+        return build
+
+    @staticmethod
+    def split_expression(expression):
+        build = []
+        item = ""
+        capture_until = []
+        escaped = ''
+        quoted = False
+        for char in expression:
+            if char == '\\' and not escaped:
+                item += char
+                escaped = True
+                continue
+            if escaped:
+                item += char
+                escaped = False
+                continue
+
+            if char == '[' and not quoted:
+                capture_until.append(']')
+            elif char == '{' and not quoted:
+                capture_until.append('}')
+            elif (char == '\'' or char == '"') and not quoted:
+                capture_until.append(char)
+                quoted = True
+            elif quoted and char == capture_until[-1]:
+                quoted = False
+                capture_until.pop()
+            elif len(capture_until) > 0 and char == capture_until[-1]:
+                capture_until.pop()
+            elif len(capture_until) == 0 and char == ',':
+                item = item.strip()
+                if len(item) > 0:
+                    build.append(item)
+                    item = ""
+                continue
+            item += char
+
+        item = item.strip()
+        if len(item) > 0:
+            build.append(item)
+
+        return build
+
+
+_TOKENS = ['[', ']', '{', '}', ',', ', ', ' ', '=>', ' => ', "'", '"', '\\', '\n', 'a', 'b c', '1', '-2', '3.5',
+           '1e3', '2e-2', '1_000', '_', '.', 'true', 'FALSE', 'None', 'nonesuch', 'pattern:^a+$', 'enum:Color.RED',
+           'enum:nope.X', 's::one', 's::two(one)', 'x::y/z', 'a::b::c', '[odd]', 'q::r@', '$(UUID)']
+
+
+def _outcome(parse, value):
+    try:
+        return 'ok', _comparable(parse(value))
+    except Exception as e:
+        return 'error', type(e)
+
+
+def _comparable(value):
+    if isinstance(value, re.Pattern):
+        return 'pattern', value.pattern
+    if isinstance(value, float):
+        return 'float', repr(value)
+    if isinstance(value, bool):
+        return 'bool', value
+    if isinstance(value, list):
+        return [_comparable(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _comparable(item) for key, item in value.items()}
+    return value
+
+
+class TestLexer(TestCase):
+
+    def setUp(self):
+        self.lexer = Lexer(_Hooks.sections, _Hooks.section, _Hooks.reference, _Hooks.enum)
+
+    def _assert_same(self, value):
+        value = value.strip()
+        self.assertEqual(_outcome(_Legacy.parse_item, value), _outcome(self.lexer.parse, value), repr(value))
+
+    def test_values(self):
+        for value in ["'quoted' tail", '"a\\"b"', "'open", 'pattern:^x\\d+$', 'enum:Color.GREEN', 'None', 'NoneSuch',
+                      '42', '-1_000', '1e3', '+2e+3', '3.', '.5', '-1.5e-3', '7e-2', '__', 'TrUe', 'false',
+                      '[]', '[1, [2, [3, [4]]], {k => [5, 6]}]', "[a, 'b, c', \"d]\", e\\,f]", '[a] [b]', '[[a, b]',
+                      '[s::one, s::two(one), [odd], x::y/z]', '{a => 1, \'b c\' => [x, {y => z}], "d" => }',
+                      '{a => 1, b}', "{'k=>v' => 1}", '{a\\=> 1}', '{a => [1, 2] tail}', '[1, 2,, 3, ]',
+                      '{ => 1}', "['a\\'b', \"c\\\"d\"]", '[{a => [1, {b => [2]}]}, [3, {c => d}]]', 'a::b::c',
+                      '[\n  1,\n  2\n]', "'multi\nline'", 'x\\y\\z', 'plain text', '', '[enum:nope.X, [a]',
+                      '[[enum:nope.X, a]', '{a => [b, c}', '{a => b], c => d}']:
+            self._assert_same(value)
+
+    def test_fuzz(self):
+        rnd = random.Random(1234)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # random 'pattern:' values
+            for _ in range(20000):
+                value = ''.join(rnd.choice(_TOKENS) for _ in range(rnd.randint(1, 14)))
+                if rnd.random() < 0.5:
+                    opener = rnd.choice('[{')
+                    value = opener + value + (']' if opener == '[' else '}')
+                self._assert_same(value)
+
+    def test_large_array(self):
+        value = '[{}]'.format(', '.join('[{0}, {{k{0} => "v{0}"}}]'.format(i) for i in range(20000)))
+        parsed = self.lexer.parse(value)
+        self.assertEqual(20000, len(parsed))
+        self.assertEqual([19999, {'k19999': 'v19999'}], parsed[-1])
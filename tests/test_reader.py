@@ -0,0 +1,81 @@
+import configparser
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from supercfg import Cfg, CfgRegistry, stats
+from supercfg.reader import IndexedParser
+
+_SCRIPT = """; leading comment
+
+[DEFAULT]
+shared = 1
+
+[a::1]
+x = [1,
+  2, 3]
+y = 'text'
+; [not::a-header]
+  [continued::value]
+
+[a::2(1)]
+x = 4
+other = o::1@other
+"""
+
+
+class TestReader(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = self._write('main', _SCRIPT)
+        self._write('other', '[o::1]\nvalue = 5\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.dir, '{}.cfg'.format(name))
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_same_as_configparser(self):
+        for path in (self.path, 'conf/example.cfg', 'conf/test/something.cfg'):
+            indexed = IndexedParser(path)
+            parser = configparser.ConfigParser()
+            parser.read(path)
+
+            self.assertEqual(parser.sections(), indexed.sections())
+            self.assertEqual(list(parser), list(indexed))
+            for key in parser.sections():
+                self.assertIn(key, indexed)
+                self.assertEqual(parser.items(key, raw=True), indexed.items(key, raw=True))
+                self.assertEqual(dict(parser[key]), dict(indexed[key]))
+            indexed.close()
+
+    def test_malformed(self):
+        self.assertRaises(configparser.DuplicateSectionError,
+                          lambda: IndexedParser(self._write('duplicate', '[a::1]\nx = 1\n[a::1]\nx = 2\n')))
+        self.assertRaises(configparser.MissingSectionHeaderError,
+                          lambda: IndexedParser(self._write('headless', 'x = 1\n[a::1]\n')))
+        self.assertEqual([], IndexedParser(self._write('empty', '')).sections())
+
+    def test_cfg(self):
+        expected = Cfg.parse(self.path, registry=CfgRegistry(max_size=0))
+        cfg = Cfg.parse(self.path, registry=CfgRegistry(max_size=0), indexed=True)
+        self.assertTrue(cfg.indexed)
+        for identifier, sect in expected.sections.items():
+            self.assertEqual(sect.to_dict, cfg[identifier].to_dict)
+        self.assertTrue(cfg.parse_other_cfg('other').indexed)
+
+    def test_lazy_lookup(self):
+        stats.enable()
+        try:
+            cfg = Cfg.parse(self.path, lazy=True, registry=CfgRegistry(max_size=0), indexed=True)
+            self.assertEqual('text', cfg['a::2/y'])
+            self.assertEqual(5, cfg['a::2/other/value'])
+            self.assertEqual(3, stats.snapshot()['counters']['sections_parsed'])  # a::2, a::1, o::1
+        finally:
+            stats.disable()
@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+
+from supercfg import Cfg, CfgRegistry
+
+
+class TestRegistry(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for name in ('something', 'templates'):
+            shutil.copy('conf/test/{}.cfg'.format(name), self.dir)
+        with open(os.path.join(self.dir, 'other.cfg'), 'w') as f:
+            f.write('[B::other(common@templates)]\nfield2 = 2\n')
+        self.registry = CfgRegistry()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _path(self, name):
+        return os.path.join(self.dir, '{}.cfg'.format(name))
+
+    def test_single_instance_per_file(self):
+        cfg1 = Cfg.parse(self._path('something'), registry=self.registry)
+        cfg2 = Cfg.parse(self._path('something'), registry=self.registry)
+        self.assertIs(cfg1, cfg2)
+        self.assertIsNot(cfg1, Cfg.parse(self._path('something'), lazy=True, registry=self.registry))
+
+    def test_shared_cross_file_loads(self):
+        something = Cfg.parse(self._path('something'), registry=self.registry)
+        other = Cfg.parse(self._path('other'), registry=self.registry)
+
+        self.assertEqual(1, other['B::other'].field1[0])
+        self.assertEqual(1, something['B::conf'].field1[0])
+        self.assertIs(something.parse_other_cfg('templates'), other.parse_other_cfg('templates'))
+        self.assertEqual(3, len(self.registry))
+
+    def test_revalidation(self):
+        cfg1 = Cfg.parse(self._path('other'), registry=self.registry)
+
+        st = os.stat(self._path('other'))
+        with open(self._path('other'), 'a') as f:
+            f.write('field3 = 3\n')
+        os.utime(self._path('other'), ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        cfg2 = Cfg.parse(self._path('other'), registry=self.registry)
+        self.assertIsNot(cfg1, cfg2)
+        self.assertEqual(3, cfg2['B::other'].field3)
+
+    def test_lru_eviction(self):
+        self.registry.max_size = 1
+        something = Cfg.parse(self._path('something'), registry=self.registry)
+        Cfg.parse(self._path('other'), registry=self.registry)
+
+        self.assertEqual(1, len(self.registry))
+        self.assertNotIn(self._path('something'), self.registry)
+        self.assertIsNot(something, Cfg.parse(self._path('something'), registry=self.registry))
+
+    def test_threads(self):
+        parsed = []
+        threads = [threading.Thread(target=lambda: parsed.append(Cfg.parse(self._path('something'),
+                                                                             registry=self.registry)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len({id(cfg) for cfg in parsed}))
+
+    def test_templated_files_not_shared(self):
+        with open(self._path('run'), 'w') as f:
+            f.write('[R::run]\nid = run-$(UUID)\n')
+        for indexed in (False, True):
+            cfg1 = Cfg.parse(self._path('run'), registry=self.registry, indexed=indexed)
+            cfg2 = Cfg.parse(self._path('run'), registry=self.registry, indexed=indexed)
+            self.assertIsNot(cfg1, cfg2)
+            self.assertNotEqual(cfg1['R::run'].id, cfg2['R::run'].id)
+        self.assertNotIn(self._path('run'), self.registry)
+        self.assertFalse(Cfg.parse(self._path('something'), registry=self.registry).templated)
+
+    def test_indexed_instances(self):
+        for order in ((False, True), (True, False)):
+            registry = CfgRegistry()
+            for indexed in order:
+                cfg = Cfg.parse(self._path('something'), registry=registry, indexed=indexed)
+                self.assertEqual(indexed, cfg.indexed)
+                self.assertIs(cfg, Cfg.parse(self._path('something'), registry=registry, indexed=indexed))
+            self.assertEqual(2, len(registry))
+
+    def test_dependency_revalidation(self):
+        something = Cfg.parse(self._path('something'), registry=self.registry)
+        self.assertEqual('c', something['A::conf'].field1[2])
+        self.assertIn(os.path.abspath(self._path('templates')), something.stamps)
+        self.assertIs(something, Cfg.parse(self._path('something'), registry=self.registry))
+
+        with open(self._path('templates'), 'a') as f:
+            f.write('\n[C::extra]\nfield1 = 1\n')
+        reparsed = Cfg.parse(self._path('something'), registry=self.registry)
+        self.assertIsNot(something, reparsed)
+        self.assertIs(reparsed, Cfg.parse(self._path('something'), registry=self.registry))
+
+    def test_shared_sections_read_only(self):
+        cfg = Cfg.parse(self._path('other'), registry=self.registry)
+        sect = cfg['B::other']
+        self.assertRaises(Exception, lambda: sect.__setitem__('field2', 3))
+        self.assertRaises(Exception, lambda: setattr(sect, 'field2', 3))
+        self.assertRaises(Exception, lambda: sect._super.__setitem__('field1', 0))  # of templates.cfg
+        self.assertEqual(2, Cfg.parse(self._path('other'), registry=self.registry)['B::other'].field2)
+
+        self.assertEqual(3, cfg.overlay({'B::other/field2': 3})['B::other'].field2)
+        private = Cfg.parse(self._path('other'), registry=CfgRegistry(max_size=0))
+        private['B::other']['field2'] = 4
+        self.assertEqual(4, private['B::other'].field2)
+        self.assertEqual(2, cfg['B::other'].field2)
+
+    def test_default_bounded(self):
+        self.assertIsNotNone(CfgRegistry.default().max_size)
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from typing import Any, List, Optional, Union
+from unittest import TestCase
+
+from supercfg import Cfg, Schema, Section, TypedSection
+
+_SCRIPT = """
+    [fs::local]
+    root = /tmp
+
+    [tokenizer::roberta]
+    factory = class:collections.OrderedDict
+    vocab_size = None
+    min_frequency = 1
+    special_tokens = [<|eop|>, <|eos|>]
+    fs = fs::local
+
+    [tokenizer::roberta-32000(roberta)]
+    vocab_size = 32000
+    dropout = 0.1
+
+    [tokenizer::roberta-16384(roberta)]
+    vocab_size = 16384
+    dropout = 1e3
+"""
+
+
+class TestSchema(TestCase):
+
+    def setUp(self):
+        self.cfg = Cfg.parse_string(_SCRIPT)
+
+    def test_declared(self):
+        fs = Schema('fs', {'root': str})
+        schema = Schema('tokenizer', {'factory': type, 'vocab_size': Optional[int], 'special_tokens': List[str],
+                                      'dropout': Optional[float], 'fs': fs})
+        tokenizers = self.cfg.typed(schema)
+
+        self.assertEqual(['tokenizer::roberta', 'tokenizer::roberta-32000', 'tokenizer::roberta-16384'],
+                         list(tokenizers))
+        tokenizer = tokenizers['tokenizer::roberta-32000']
+        self.assertIsInstance(tokenizer, schema.type)
+        self.assertIsInstance(tokenizer, TypedSection)
+        self.assertEqual('TokenizerSection', type(tokenizer).__name__)
+        self.assertFalse(hasattr(tokenizer, '__dict__'))
+        self.assertEqual(32000, tokenizer.vocab_size)
+        self.assertIs(OrderedDict, tokenizer.factory)
+        self.assertEqual('/tmp', tokenizer.fs.root)
+        self.assertIs(tokenizer.fs, tokenizers['tokenizer::roberta'].fs)
+        self.assertIsNone(tokenizers['tokenizer::roberta'].dropout)
+        self.assertEqual(1000.0, tokenizers['tokenizer::roberta-16384'].dropout)
+        self.assertIsInstance(tokenizers['tokenizer::roberta-16384'].dropout, float)
+        self.assertEqual('tokenizer::roberta-32000', tokenizer.identifier)
+        self.assertEqual({'name': 'roberta-32000', 'clazz': 'tokenizer', 'factory': OrderedDict, 'vocab_size': 32000,
+                          'special_tokens': ['<|eop|>', '<|eos|>'], 'dropout': 0.1,
+                          'fs': {'name': 'local', 'clazz': 'fs', 'root': '/tmp'}}, tokenizer.to_dict)
+
+    def test_validation(self):
+        with self.assertRaises(Exception) as context:
+            self.cfg.typed(Schema('tokenizer', {'vocab_size': int}))
+        self.assertEqual("wrong type of field: vocab_size, expected: int, got: None, in: tokenizer::roberta",
+                         str(context.exception))
+
+        with self.assertRaises(Exception) as context:
+            self.cfg.typed(Schema('tokenizer', {'dropout': float}))
+        self.assertEqual('missing field: dropout, in: tokenizer::roberta', str(context.exception))
+
+        self.assertRaises(Exception, lambda: self.cfg.typed(Schema('tokenizer', {'min_frequency': bool})))
+        self.assertRaises(Exception, lambda: self.cfg.typed(Schema('tokenizer', {'fs': Schema('other', {})})))
+        self.assertRaises(Exception, lambda: Schema('tokenizer', {'special-tokens': list}))
+        self.assertRaises(Exception, lambda: Schema('tokenizer', {'name': str}))
+
+    def test_inferred(self):
+        schema = Schema.infer(self.cfg, 'tokenizer')
+
+        self.assertEqual({'factory': type, 'min_frequency': int, 'special_tokens': list, 'fs': Section,
+                          'vocab_size': Optional[int], 'dropout': Optional[float]}, schema.fields)
+        tokenizers = self.cfg.typed('tokenizer')
+        self.assertEqual(16384, tokenizers['tokenizer::roberta-16384'].vocab_size)
+        self.assertEqual(Any, Schema.infer(Cfg.parse_string('[a::1]\nx = None\n'), 'a').fields['x'])
+        mixed = Cfg.parse_string('[a::1]\nx = 1\n[a::2]\nx = b\n')
+        self.assertEqual(Union[int, str], Schema.infer(mixed, 'a').fields['x'])
+        self.assertRaises(Exception, lambda: Schema.infer(self.cfg, 'none'))
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import supercfg
+from supercfg import Cfg, CfgRegistry, Manifest, SearchPath, stats
+
+
+class TestSearch(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.project = os.path.join(self.dir, 'project')
+        self.shared = os.path.join(self.dir, 'shared')
+        os.makedirs(self.project)
+        os.makedirs(os.path.join(self.shared, 'nlp'))
+        self._write(self.project, 'train.cfg', """
+            [ds::delo(base@nlp/datasets)]
+            tokenizer = tokenizer::bpe@tokenizers
+            local = fs::local@storage
+        """)
+        self._write(self.project, 'storage.cfg', '[fs::local]\nroot = /data\n')
+        self._write(self.shared, 'storage.cfg', '[fs::local]\nroot = /shared\n')
+        self._write(self.shared, 'tokenizers.cfg', '[tokenizer::bpe]\nvocab_size = 1000\n')
+        self._write(os.path.join(self.shared, 'nlp'), 'datasets.cfg', '[ds::base]\nsize = 100\n')
+        SearchPath.invalidate()
+
+    def tearDown(self):
+        SearchPath.set_default(None)
+        SearchPath.invalidate()
+        shutil.rmtree(self.dir)
+
+    @staticmethod
+    def _write(dir_path, name, text):
+        with open(os.path.join(dir_path, name), 'w') as f:
+            f.write('\n'.join(line.strip() for line in text.strip().splitlines()) + '\n')
+
+    def _parse(self):
+        return Cfg.parse(os.path.join(self.project, 'train.cfg'), registry=CfgRegistry(max_size=0))
+
+    def test_search_path(self):
+        self.assertRaises(Exception, lambda: self._parse()['ds::delo'])
+
+        SearchPath.set_default(SearchPath([self.shared]))
+        cfg = self._parse()
+        self.assertEqual(1000, cfg['ds::delo/tokenizer/vocab_size'])
+        self.assertEqual(100, cfg['ds::delo/size'])
+        self.assertEqual('/data', cfg['ds::delo/local/root'])  # the dir of the referencing cfg comes first
+
+        stats.enable()
+        try:
+            self.assertIsNotNone(cfg.parse_other_cfg('nlp/datasets', cache=False))
+            self.assertIsNone(cfg.parse_other_cfg('none', cache=False))
+            self.assertIsNone(cfg.parse_other_cfg('none', cache=False))
+            self.assertEqual(2, stats.snapshot()['counters']['stat_probes'])  # 'none' in both dirs, once
+        finally:
+            stats.disable()
+
+    def test_manifest(self):
+        search = SearchPath([self.shared], manifest=True)
+        SearchPath.set_default(search)
+        self.assertEqual(os.path.join(self.shared, 'tokenizers.cfg'), search.locate('tokenizer::bpe'))
+        self.assertEqual(os.path.join(self.shared, 'nlp', 'datasets.cfg'), search.locate('ds::base'))
+        self.assertIsNone(search.locate('ds::none'))
+
+        stats.enable()
+        try:
+            self.assertEqual(100, self._parse()['ds::delo/size'])
+            counters = stats.snapshot()['counters']
+            self.assertEqual(0, counters.get('manifest_builds', 0))  # built by locate()
+            self.assertEqual(2, counters['manifest_lookups'])
+        finally:
+            stats.disable()
+
+        file = os.path.join(self.dir, 'manifest.json')
+        search.manifest.save(file)
+        self.assertEqual(search.manifest.files, Manifest.load(file).files)
+        loaded = SearchPath([self.shared], manifest=file)
+        self.assertEqual(search.manifest.sections, loaded.manifest.sections)
+
+    def test_packages(self):
+        self.assertEqual(list(supercfg.__path__), SearchPath(['package:supercfg']).dirs)
+        self.assertRaises(Exception, lambda: SearchPath(['package:no_such_package']).dirs)
@@ -0,0 +1,84 @@
+import multiprocessing
+import pickle
+import re
+from types import MappingProxyType
+from unittest import TestCase
+
+from supercfg import Cfg, CfgRegistry, SharedCfg, SharedSection
+
+
+def _read(shared):
+    try:
+        return shared['A::conf/field1'], shared['Y::knock_knock'].derived1['b'], len(shared.sections)
+    finally:
+        shared.close()
+
+
+class TestShm(TestCase):
+
+    def setUp(self):
+        self.cfg = Cfg.parse('conf/test/something.cfg', registry=CfgRegistry(max_size=0))
+        self.shared = self.cfg.share()
+
+    def tearDown(self):
+        self.shared.close()
+        self.shared.unlink()
+
+    def test_same_as_frozen(self):
+        frozen = self.cfg.freeze()
+
+        self.assertEqual(len(frozen.sections), len(self.shared))
+        self.assertEqual(list(frozen.sections), list(self.shared.sections))
+        for identifier, sect in frozen.sections.items():
+            self.assertIn(identifier, self.shared)
+            self.assertEqual(sect.to_dict, self.shared[identifier].to_dict)
+        self.assertNotIn('A::none', self.shared)
+        self.assertIsInstance(self.shared['A::conf'], SharedSection)
+        self.assertEqual(('a', 'b', 'c'), self.shared['A::conf'].field1)
+        self.assertIsInstance(self.shared['X::bla'].field1, MappingProxyType)
+        self.assertEqual('conf', self.shared['A::conf/name'])
+        self.assertRaises(Exception, lambda: self.shared['A::none'])
+        self.assertRaises(Exception, lambda: self.shared['A::conf/none'])
+
+    def test_immutable(self):
+        sect = self.shared['X::bla']
+        self.assertRaises(Exception, lambda: setattr(sect, 'field2', True))
+        self.assertRaises(Exception, lambda: sect.__setitem__('field2', True))
+        self.assertFalse(hasattr(sect, '__dict__'))
+
+    def test_values(self):
+        cfg = Cfg.parse_string("""
+            [a::1]
+            pattern = pattern:^a+$
+            big = 123456789012345678901234567890
+            nested = {x => [1, {y => [none, true, 2.5]}], 1 => a::2}
+
+            [a::2]
+            up = a::1/big
+            zeros = [0.0, -0.0, 0]
+        """)
+        with cfg.share() as shared:
+            self.assertEqual(['0.0', '-0.0', '0'], [repr(v) for v in shared['a::2/zeros']])
+            self.assertEqual(re.compile('^a+$'), shared['a::1'].pattern)
+            self.assertEqual(123456789012345678901234567890, shared['a::2/up'])
+            self.assertEqual(cfg.freeze()['a::1'].to_dict, shared['a::1'].to_dict)
+            self.assertEqual(shared['a::2'], shared['a::1'].nested['1'])
+
+    def test_deep_nesting(self):
+        depth = 3000
+        script = '[r::0]\nvalue = 0\n' + ''.join('[r::{}]\nvalue = r::{}\n'.format(i, i - 1) for i in range(1, depth))
+        with Cfg.parse_string(script).share() as shared:
+            sect = shared['r::{}'.format(depth - 1)]
+            for _ in range(depth - 1):
+                sect = sect.value
+            self.assertEqual(0, sect.value)
+
+    def test_attach(self):
+        attached = SharedCfg.attach(self.shared.name)
+        self.assertEqual(self.shared['Q::waw'].to_dict, attached['Q::waw'].to_dict)
+        attached.close()
+
+        with multiprocessing.get_context('spawn').Pool(2) as pool:
+            results = pool.map(_read, [self.shared] * 2)
+        self.assertEqual([(('a', 'b', 'c'), 3e10, len(self.shared))] * 2, results)
+        self.assertLess(len(pickle.dumps(self.shared)), 200)
@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from supercfg import Cfg, CfgRegistry, stats, symbols
+
+
+class TestStats(TestCase):
+
+    def tearDown(self):
+        stats.disable()
+
+    def test_disabled(self):
+        cfg = Cfg.parse('conf/test/something.cfg', registry=CfgRegistry(max_size=0))
+        self.assertEqual('c', cfg['A::conf'].field1[2])
+        self.assertEqual({}, Cfg.stats())
+
+    def test_counters(self):
+        events = []
+        stats.enable(hook=lambda phase, seconds: events.append(phase))
+
+        cfg = Cfg.parse('conf/test/something.cfg', registry=CfgRegistry(max_size=0))
+        self.assertEqual('c', cfg['Q::waw'].derived1[2])
+
+        snapshot = Cfg.stats()
+        self.assertEqual(6 + 2, snapshot['counters']['sections_parsed'])
+        self.assertEqual(1, snapshot['counters']['cross_file_loads'])
+        self.assertGreater(snapshot['counters']['refs_resolved'], 0)
+        self.assertGreater(snapshot['resolves']['conf/test/something.cfg']['Q::waw'], 0)
+        self.assertEqual(2, snapshot['counters']['registry_misses'])
+        for phase in ('read', 'parse', 'resolve'):
+            self.assertGreaterEqual(snapshot['phases'][phase], 0.0)
+        self.assertNotIn('templates', snapshot['phases'])  # no $(...) in the files
+        self.assertIn('read', events)
+
+    def test_enum_imports(self):
+        symbols.clear()  # imported symbols are cached per process
+        stats.enable()
+        cfg = Cfg.parse_string("""
+            [a::1]
+            choice = enum:pstats.SortKey.calls
+        """)
+        self.assertEqual(1, len(cfg.sections))
+
+        self.assertEqual(1, Cfg.stats()['counters']['enum_imports'])
+        self.assertEqual(1, Cfg.stats()['counters']['symbol_imports'])
+        self.assertIn('imports', Cfg.stats()['phases'])
+
+    def test_resolved_once(self):
+        stats.enable()
+        cfg = Cfg.parse_string("""
+            [a::shared]
+            x = 1
+
+            [b::1]
+            y = [a::shared, a::shared/x]
+
+            [b::2(1)]
+            z = {k => a::shared}
+        """)
+        self.assertEqual(1, cfg['b::2'].y[1])
+        cfg.sections  # noqa
+        cfg['a::shared'].resolve()
+
+        self.assertEqual({cfg.path: {'a::shared': 1, 'b::1': 1, 'b::2': 1}}, Cfg.stats()['resolves'])
+        self.assertEqual(3, Cfg.stats()['counters']['resolve_calls'])
@@ -0,0 +1,86 @@
+from unittest import TestCase
+
+from supercfg import Cfg, Sweep, stats
+
+
+class TestSweep(TestCase):
+
+    def setUp(self):
+        self.cfg = Cfg.parse_string("""
+            [tokenizer::roberta]
+            vocab_size = 32000
+
+            [tokenizer::bpe]
+            vocab_size = 1000
+
+            [optimizer::adam]
+            lr = 1e-3
+            tokenizer = tokenizer::roberta
+
+            [pipeline::train]
+            optimizer = optimizer::adam
+            lr = optimizer::adam/lr
+
+            [sweep::adam]
+            base = optimizer::adam
+            lr = [1e-4, 3e-4, 1e-3]
+            tokenizer = [tokenizer::roberta, tokenizer::bpe]
+
+            [sweep::adam-zip(adam)]
+            mode = zip
+            lr = [1e-4, 3e-4]
+        """, lazy=True)
+
+    def test_product(self):
+        sweep = self.cfg.sweep('sweep::adam')
+        self.assertIsInstance(sweep, Sweep)
+        self.assertEqual('optimizer::adam', sweep.base)
+        self.assertEqual(['lr', 'tokenizer'], sweep.fields)
+        self.assertEqual(6, len(sweep))
+        self.assertEqual([(1e-4, 'roberta'), (1e-4, 'bpe'), (3e-4, 'roberta'), (3e-4, 'bpe'), (1e-3, 'roberta'),
+                          (1e-3, 'bpe')], [(sect.lr, sect.tokenizer.name) for sect in sweep])
+        self.assertIs(self.cfg['tokenizer::bpe'], sweep[-1].tokenizer)
+        self.assertEqual(3e-4, sweep.overlay(3)['pipeline::train/lr'])
+        self.assertEqual(1e-3, self.cfg['pipeline::train/lr'])
+        self.assertIs(self.cfg['tokenizer::roberta'], sweep.overlay(0)['tokenizer::roberta'])
+        self.assertRaises(IndexError, lambda: sweep[6])
+
+    def test_index(self):
+        sweep = self.cfg.sweep('sweep::adam-zip')
+        self.assertEqual('zip', sweep.mode)
+        self.assertEqual(2, len(sweep))
+
+        self.assertEqual(1e-4, sweep[0].lr)  # the first variant maps the dependents of the cfg's sections
+        self.assertEqual({'lr': 3e-4, 'tokenizer': self.cfg['tokenizer::bpe']}, sweep.values(1))
+        stats.enable()
+        try:
+            self.assertEqual(3e-4, sweep[1].lr)
+            self.assertEqual(1, stats.snapshot()['counters']['sections_parsed'])  # optimizer::adam of the variant
+        finally:
+            stats.disable()
+
+    def test_errors(self):
+        cfg = Cfg.parse_string("""
+            [a::1]
+            x = 1
+
+            [sweep::no-base]
+            x = [1, 2]
+
+            [sweep::scalar]
+            base = a::1
+            x = 2
+
+            [sweep::mode]
+            base = a::1
+            mode = grid
+            x = [1, 2]
+
+            [sweep::zip]
+            base = a::1
+            mode = zip
+            x = [1, 2]
+            y = [1]
+        """)
+        for identifier in ('sweep::no-base', 'sweep::scalar', 'sweep::mode', 'sweep::zip', 'sweep::none'):
+            self.assertRaises(Exception, lambda: cfg.sweep(identifier))
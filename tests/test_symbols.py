@@ -0,0 +1,60 @@
+import pickle
+from collections import OrderedDict
+from unittest import TestCase
+
+from supercfg import Cfg, symbols
+from supercfg.symbols import LazySymbol
+from tests.test_cfg import Choices
+
+_SCRIPT = """
+    [a::1]
+    choice = enum:tests.test_cfg.Choices.B
+    factory = class:collections.OrderedDict
+    join = callable:os.path.join
+    choices = [enum:tests.test_cfg.Choices.A, enum:tests.test_cfg.Choices.C]
+"""
+
+
+class TestSymbols(TestCase):
+
+    def tearDown(self):
+        symbols.defer_imports(False)
+
+    def test_import_symbol(self):
+        import os.path
+        self.assertIs(os.path.join, symbols.import_symbol('os.path.join'))
+        self.assertIs(symbols.import_symbol('json.decoder.JSONDecoder'),
+                      symbols.import_symbol('json.decoder.JSONDecoder'))
+        self.assertIs(int, symbols.import_symbol('int'))
+        self.assertRaises(ModuleNotFoundError, lambda: symbols.import_symbol('no_such_module.X'))
+
+    def test_values(self):
+        sect = Cfg.parse_string(_SCRIPT)['a::1']
+
+        self.assertIs(Choices.B, sect.choice)
+        self.assertIs(OrderedDict, sect.factory)
+        self.assertEqual('a/b', sect.join('a', 'b'))
+        self.assertEqual([Choices.A, Choices.C], sect.choices)
+        self.assertRaises(Exception, lambda: Cfg.parse_string('[a::1]\nx = class:os.path.join\n').sections)
+        self.assertRaises(Exception, lambda: Cfg.parse_string('[a::1]\nx = callable:os.sep\n').sections)
+
+    def test_deferred(self):
+        symbols.defer_imports()
+        cfg = Cfg.parse_string(_SCRIPT + """
+    broken = class:supercfg_no_such_module.Factory
+""")
+        sect = cfg['a::1']
+
+        self.assertIsInstance(sect.factory, LazySymbol)
+        self.assertIsInstance(sect.broken, LazySymbol)  # not imported yet
+        self.assertEqual(Choices.B, sect.choice)
+        self.assertEqual('B', sect.choice.value)
+        self.assertEqual({Choices.B}, {sect.choice})
+        self.assertEqual([('k', 1)], list(sect.factory([('k', 1)]).items()))
+        self.assertIs(OrderedDict, sect.factory.__wrapped__)
+        self.assertEqual('a/b', sect.join('a', 'b'))
+        self.assertRaises(ModuleNotFoundError, lambda: sect.broken.__wrapped__)
+
+        copy = pickle.loads(pickle.dumps(sect.choice))
+        self.assertEqual(Choices.B, copy)
+        self.assertEqual(Choices.B, cfg.freeze()['a::1'].choice)
@@ -0,0 +1,64 @@
+import os
+from unittest import TestCase
+
+from supercfg import Cfg, Templates
+
+
+class TestTemplates(TestCase):
+
+    def tearDown(self):
+        Templates.unregister('TEST_PROVIDER')
+        os.environ.pop('SUPERCFG_TEST_ENV', None)
+
+    def test_evaluated_once(self):
+        cfg = Cfg.parse_string("""
+            [a::1]
+            run = run-$(UUID)
+            dir = '/tmp/$(UUID)/$(TIMESTAMP)'
+            nested = [$(UUID), {x => [$(UUID)]}]
+
+            [a::2(1)]
+            other = $(UUID)
+        """)
+        uuid = cfg['a::1'].run[len('run-'):]
+        self.assertEqual(36, len(uuid))
+        self.assertTrue(cfg['a::1'].dir.startswith('/tmp/{}/'.format(uuid)))
+        self.assertEqual([uuid, {'x': [uuid]}], cfg['a::1'].nested)
+        self.assertEqual(uuid, cfg['a::2'].other)
+        self.assertEqual(uuid, cfg['a::2'].run[len('run-'):])
+
+        other = Cfg.parse_string('[a::1]\nrun = $(UUID)\n')
+        self.assertNotEqual(uuid, other['a::1'].run)
+
+    def test_variables(self):
+        calls = []
+        Templates.register('TEST_PROVIDER', lambda: calls.append(1) or 'provided')
+        os.environ['SUPERCFG_TEST_ENV'] = 'env'
+        cfg = Cfg.parse_string("""
+            [a::1]
+            provided = $(TEST_PROVIDER)-$(TEST_PROVIDER)
+            env = $(SUPERCFG_TEST_ENV)
+            own = $(OWN)
+            unknown = $(SUPERCFG_UNKNOWN)
+            plain = 'no templates'
+        """)
+        cfg.templates.set('OWN', lambda: 42)
+
+        self.assertEqual('provided-provided', cfg['a::1'].provided)
+        self.assertEqual(1, len(calls))
+        self.assertEqual('env', cfg['a::1'].env)
+        self.assertEqual('42', cfg['a::1'].own)
+        self.assertEqual('$(SUPERCFG_UNKNOWN)', cfg['a::1'].unknown)
+        self.assertEqual('no templates', cfg['a::1'].plain)
+
+    def test_references(self):
+        cfg = Cfg.parse_string("""
+            [a::1]
+            label = run-$(UUID)
+
+            [b::1]
+            label = a::1/label
+            labels = [a::1/label]
+        """)
+        self.assertEqual(cfg['a::1'].label, cfg['b::1'].label)
+        self.assertEqual([cfg['a::1'].label], cfg['b::1'].labels)
@@ -0,0 +1,151 @@
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+from supercfg import Cfg, CfgRegistry, CfgWatcher
+
+_ROOT = """
+[a::base]
+value = 1
+
+[a::1(base)]
+other = 'a1'
+
+[b::1]
+ref = a::1/value
+lib = l::1@lib
+
+[c::1]
+text = 'independent'
+"""
+
+_LIB = """
+[l::1]
+size = 10
+"""
+
+
+class TestWatch(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.root = self._write('root', _ROOT)
+        self._write('lib', _LIB)
+        self.cfg = Cfg.parse(self.root, registry=CfgRegistry())
+        self.assertEqual(10, self.cfg['b::1'].lib.size)
+        self.watcher = CfgWatcher(self.cfg, interval=0.05)
+
+    def tearDown(self):
+        self.watcher.stop()
+        shutil.rmtree(self.dir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.dir, '{}.cfg'.format(name))
+        stamp = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+        with open(path, 'w') as f:
+            f.write(content)
+        os.utime(path, ns=(stamp + 1_000_000_000, stamp + 1_000_000_000))
+        return path
+
+    def test_nothing_changed(self):
+        self.assertEqual([], self.watcher.poll())
+
+    def test_inheritance_and_references(self):
+        sections = dict(self.cfg.sections)
+        self._write('root', _ROOT.replace('value = 1', 'value = 2'))
+
+        self.assertEqual(['a::1', 'a::base', 'b::1'], self.watcher.poll())
+        self.assertEqual(2, self.cfg['a::1'].value)
+        self.assertEqual(2, self.cfg['b::1'].ref)
+        self.assertIs(sections['c::1'], self.cfg['c::1'])
+        self.assertIsNot(sections['b::1'], self.cfg['b::1'])
+
+    def test_cross_file(self):
+        sections = dict(self.cfg.sections)
+        self._write('lib', _LIB.replace('10', '20'))
+
+        self.assertEqual(['b::1'], self.watcher.poll())
+        self.assertEqual(20, self.cfg['b::1'].lib.size)
+        for identifier in ('a::base', 'a::1', 'c::1'):
+            self.assertIs(sections[identifier], self.cfg[identifier])
+
+    def test_added_and_removed(self):
+        self._write('root', _ROOT.replace('[c::1]', '[d::1]'))
+
+        self.assertEqual(['c::1', 'd::1'], self.watcher.poll())
+        self.assertNotIn('c::1', self.cfg.sections)
+        self.assertEqual('independent', self.cfg['d::1'].text)
+
+    def test_subscribe(self):
+        changes = []
+        self.watcher.subscribe(changes.append)
+        self.watcher.start()
+        self._write('lib', _LIB.replace('10', '30'))
+
+        deadline = time.time() + 5
+        while not changes and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual([['b::1']], changes)
+
+    def test_lazy(self):
+        cfg = Cfg.parse(self.root, lazy=True, registry=CfgRegistry())
+        self.assertEqual(10, cfg['b::1'].lib.size)
+        c1 = cfg['c::1']
+        self._write('lib', _LIB.replace('10', '40'))
+
+        self.assertEqual(['b::1'], cfg.reload())
+        self.assertEqual(40, cfg['b::1'].lib.size)
+        self.assertIs(c1, cfg['c::1'])
+
+    def test_unchanged_sections_of_other_files(self):
+        self._write('lib', _LIB + '\n[l::2]\nsize = 2\n')
+        self._write('root', _ROOT + '\n[e::1]\nlib = l::2@lib\n')
+        cfg = Cfg.parse(self.root, registry=CfgRegistry())
+        l2 = cfg['e::1'].lib
+        self._write('lib', _LIB.replace('10', '50') + '\n[l::2]\nsize = 2\n')
+
+        self.assertEqual(['b::1'], cfg.reload())
+        self.assertEqual(50, cfg['b::1'].lib.size)
+        self.assertIs(l2, cfg['e::1'].lib)
+        self.assertIs(l2, cfg.parse_other_cfg('lib')['l::2'])
+
+    def test_disk_cache(self):
+        cache_dir = os.path.join(self.dir, 'cache')
+        Cfg.parse(self.root, cache_dir=cache_dir, registry=CfgRegistry())
+        cfg = Cfg.parse(self.root, cache_dir=cache_dir, registry=CfgRegistry())
+        self.assertIsNone(cfg.parser)
+        watcher = CfgWatcher(cfg)
+        self._write('lib', _LIB.replace('10', '60'))
+
+        self.assertEqual(['a::1', 'a::base', 'b::1', 'c::1'], watcher.poll())
+        self.assertEqual(60, cfg['b::1'].lib.size)
+        self.assertEqual([], watcher.poll())
+        self._write('lib', _LIB.replace('10', '70'))
+        self.assertEqual(['b::1'], watcher.poll())
+        self.assertEqual(70, cfg['b::1'].lib.size)
+
+    def test_missing_file(self):
+        sections = dict(self.cfg.sections)
+        os.rename(self.root, self.root + '.tmp')
+
+        self.assertRaises(Exception, self.watcher.poll)
+        self.assertRaises(Exception, self.watcher.poll)  # until it's back
+        self.assertRaises(Exception, self.cfg.reload)
+        self.assertEqual(sections, self.cfg.sections)
+
+        os.rename(self.root + '.tmp', self.root)
+        self._write('root', _ROOT.replace("'independent'", "'changed'"))
+        self.assertEqual(['c::1'], self.watcher.poll())
+        self.assertIs(sections['a::1'], self.cfg['a::1'])
+
+        errors = []
+        watcher = CfgWatcher(self.cfg, interval=0.05, on_error=errors.append).start()
+        os.remove(os.path.join(self.dir, 'lib.cfg'))
+        deadline = time.time() + 5
+        while not errors and time.time() < deadline:
+            time.sleep(0.05)
+        watcher.stop()
+        self.assertIn('missing file', str(errors[0]))
+        self.assertEqual(10, self.cfg['b::1'].lib.size)